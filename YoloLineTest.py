@@ -1,168 +1,235 @@
 import cv2
 import time
-from ultralytics import YOLO
 import json
 import numpy as np
-from dataclasses import dataclass
 import status 
 import requests
-
-@dataclass
-class object:
-    centerx: float
-    centery: float
-    detect: bool
+from throughput import ThroughputMonitor
+from virtual_line import LineCounter, ZoneCounter, LineZone
+from track_log import TrackLogWriter
+from model_registry import registry, DEFAULT_MODEL
+from capture import LatestFrameCapture, is_live_source
+from trackers import make_tracker
+
+
+FIRST_FRAME_TIMEOUT = 60  # seconds a live source gets to deliver its first frame
+
+
+def wait_for_first_frame(cap, timeout=FIRST_FRAME_TIMEOUT):
+    """First frame of a live source; None after `timeout` seconds or when 'q' is pressed."""
+    waiting = np.zeros((120, 480, 3), dtype=np.uint8)
+    cv2.putText(waiting, "Waiting for the camera...", (10, 70), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (255, 255, 255), 2)
+    print("Waiting for the first frame...")
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        ret, frame = cap.read(timeout=0.1)
+        if ret:
+            return frame
+        cv2.imshow("Live Preview", waiting)
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            return None
+    print(f"❌ No frame from the source within {timeout}s")
+    return None
 
 
-def OperationStatus(video_path, out_path, line, factor, cross_threshold, targets, obj_per_time, time_th, bounds):
+def OperationStatus(video_path, out_path, line, factor, cross_threshold, targets, obj_per_time, time_th, bounds, track_log=None, model_name=DEFAULT_MODEL, zones=None, tracker="botsort"):
     # global functioning 
-    cap = cv2.VideoCapture(video_path)
-    model = YOLO("Our_Models/Best_Models/bestdet.pt") 
+    # live cameras/streams: always process the newest frame instead of a growing backlog
+    live = is_live_source(video_path)
+    cap = LatestFrameCapture(video_path, name="OperationStatus") if live else cv2.VideoCapture(video_path)
+    model_version = registry.version(model_name)
+    model = registry.tracker(model_name)
 
  # Box: 0, Fruit: 1, bag: 2, bottle: 3, jar: 4, mask: 5, pallet: 6
- # video_path: for the input video stream 
+ # video_path: for the input video stream (file, camera index or stream url)
  # out_path: for the log
  # line: boolean used to see if we are using a vertical or horizotal line
  # factor: what will be multiplied with either the eidth of height for the line
  # cross_threshold: the time before the process is considered to have stopped
  # targets: a list containing the target classes
  # obj_per_time: the usual object per specific time produced in production
- # time_th: Minimum time that has to pass before checking the state of operation
+ # time_th: the time period (seconds) obj_per_time refers to
  # bounds: the margin of error allowed for the number of products produced
-
-
-    # output video writer setup
-    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
-    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
-
-    fps = cap.get(cv2.CAP_PROP_FPS)
+ # model_name: a model_registry name (or weights path), shared with other lines using it
+ # track_log: optional path of a binary track log (see track_log.py) to replay later without YOLO
+ # tracker: "botsort" (ultralytics, botsort.yaml) or "conveyor" (motion-only, see trackers.py)
+ # zones: optional extra LineZone / PolygonZone list (virtual_line.py) counted from the same tracks
+
+
+    out_video = None
+    log_writer = None
+    try:
+        # output video writer setup
+        if live:
+            # the stream may still be connecting, so take the size from the first frame
+            frame = wait_for_first_frame(cap)
+            if frame is None:
+                return
+            height, width = frame.shape[:2]
+        else:
+            width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+            height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+        fps = cap.get(cv2.CAP_PROP_FPS) or 30  # some live streams do not report their fps
     
-    # Initialize VideoWriter to save the processed video
-    fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # or use 'XVID'
-    output_video_path = 'output_processed.mp4'  # or take this as a parameter
-    out_video = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
-
-    # vertical line position (middle of frame but can tweak it a lot)
-    line_x = int(width * factor)
-    line_y = int(height * factor)
-    last_cross_time = time.time()
-    start_time = time.time()
-
-    avg_time = 0.0
-    time_between_crossings = []
-    obj_count = 0
-    frame_count = 0
-    previous_positions = {}
-
-    while cap.isOpened():
-        ret, frame = cap.read()
-        frame_count += 1
-        if not ret:
-            break
-
-        results = model.track(source=frame, conf=0.1, iou=0.5, show=False, persist=True, tracker="botsort.yaml")
-
-        # Draw the virtual line (visualization)
-        if line:  # horizontal line
-            cv2.line(frame, (0, line_y), (width, line_y), (0, 0, 255), 2)
-        else:  # vertical line
-            cv2.line(frame, (line_x, 0), (line_x, height), (0, 0, 255), 2)
-
-        if results[0].boxes.id != None:
-            boxes = results[0].boxes.xyxy.cpu().numpy()
-            IDs = results[0].boxes.id.cpu().numpy()
-            classes = results[0].boxes.cls.cpu().numpy()
-            
-            for box, Id, clas in zip(boxes, IDs, classes):
-                if clas in targets:
-                    obj_id = Id
-                    x1, y1, x2, y2 = box
-            
-                    cx = int((x1 + x2) / 2)
-                    cy = int((y1 + y2) / 2)
-
-                    obj = object(cx, cy, False)
-                    prev = previous_positions.get(obj_id, obj)
-
-                    # drawing the bounding boxes and the ID Labels
-                    cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (255, 255, 0), 2)
-                    cv2.circle(frame, (cx, cy), 5, (0, 255, 0), -1)
-                    label = f"ID: {obj_id}"
-                    cv2.putText(frame, label, (int(x1), int(y1) - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2, cv2.LINE_AA)
-
-                    prevc = prev.centery if line else prev.centerx
-                    center = cy if line else cx
-                    vir_line = line_y if line else line_x
-
-                    if prev != obj:
-                        if (prevc < vir_line) and (center >= vir_line):
-                            if prev.detect == False:
-                                obj_count += 1
-                            prev.detect = True
-                            if (time.time() - last_cross_time > 0.5):
-                                time_between_crossings.append(time.time() - last_cross_time)
-                            last_cross_time = time.time()
-                    
-                    if previous_positions.get(obj_id) == None:
-                        previous_positions[obj_id] = obj
+        # Initialize VideoWriter to save the processed video
+        fourcc = cv2.VideoWriter_fourcc(*'mp4v')  # or use 'XVID'
+        output_video_path = 'output_processed.mp4'  # or take this as a parameter
+        out_video = cv2.VideoWriter(output_video_path, fourcc, fps, (width, height))
+
+        # vertical line position (middle of frame but can tweak it a lot)
+        counter = LineCounter(line, factor, width, height, targets)
+        line_x = int(width * factor)
+        line_y = int(height * factor)
+        log_writer = TrackLogWriter(track_log, width, height, fps, video_path) if track_log else None
+        last_cross_time = time.time()
+        monitor = ThroughputMonitor(obj_per_time, time_th, bounds, cross_threshold)
+        zone_counter = ZoneCounter(zones or [], defaults={"time_th": time_th, "bounds": bounds,
+                                                          "cross_threshold": cross_threshold})
+        box_tracker = make_tracker(tracker, line)
+        functioning = status.functioning
+        # the new tracker after a hot-swap numbers its ids from 1 again; shifting them
+        # past every id seen so far keeps ids unique in the counters and the track log
+        id_offset = 0
+        max_id = 0
+
+        avg_time = 0.0
+        time_between_crossings = []
+        frame_count = 0
+
+        while cap.isOpened():
+            ret, frame = cap.read()
+            if not ret and not live:
+                break
+
+            # live source without a new frame (e.g. reconnecting): nothing to detect, but the
+            # status below is still evaluated, so an outage shows up as a stoppage
+            if ret:
+                frame_count += 1
+
+                # weights were hot-swapped: new tracker, so the old ids mean nothing anymore
+                if registry.version(model_name) != model_version:
+                    model_version = registry.version(model_name)
+                    model = registry.tracker(model_name)
+                    id_offset = max_id
+                    counter.reset_tracks()
+                    zone_counter.reset_tracks()
+                    if box_tracker:
+                        box_tracker.reset()
+
+                if box_tracker is None:
+                    results = model.track(source=frame, conf=0.1, iou=0.5, show=False, persist=True, tracker="botsort.yaml")
+                    tracked = results[0].boxes.id != None
+                    if tracked:
+                        boxes = results[0].boxes.xyxy.cpu().numpy()
+                        IDs = results[0].boxes.id.cpu().numpy()
+                        classes = results[0].boxes.cls.cpu().numpy()
+                        confs = results[0].boxes.conf.cpu().numpy()
+                else:
+                    results = model.predict(source=frame, conf=0.1, iou=0.5, show=False, verbose=False)
+                    detections = results[0].boxes
+                    boxes, IDs, classes, confs = box_tracker.update(detections.xyxy.cpu().numpy(),
+                                                                    detections.cls.cpu().numpy(),
+                                                                    detections.conf.cpu().numpy())
+                    tracked = len(IDs) > 0
+
+                if tracked:
+                    IDs = IDs + id_offset
+                    max_id = max(max_id, int(IDs.max()))
+
+                # Draw the virtual line (visualization)
+                if line:  # horizontal line
+                    cv2.line(frame, (0, line_y), (width, line_y), (0, 0, 255), 2)
+                else:  # vertical line
+                    cv2.line(frame, (line_x, 0), (line_x, height), (0, 0, 255), 2)
+
+                for zone in zone_counter.zones:
+                    if isinstance(zone, LineZone):
+                        cv2.line(frame, tuple(map(int, zone.start)), tuple(map(int, zone.end)), (255, 0, 255), 2)
                     else:
-                        temp_obj = previous_positions[obj_id]
-                        temp_obj.centerx = obj.centerx
-                        temp_obj.centery = obj.centery
-                        previous_positions[obj_id] = temp_obj
+                        cv2.polylines(frame, [np.array(zone.points, dtype=np.int32)], True, (255, 0, 255), 2)
+
+                now = time.time()
+                if tracked:
+                    if log_writer:
+                        log_writer.write_frame(frame_count, now, IDs, classes, confs, boxes)
+
+                    for box, Id, clas in zip(boxes, IDs, classes):
+                        if clas in targets or any(clas in zone.targets for zone in zone_counter.zones):
+                            x1, y1, x2, y2 = box
+                            cx = int((x1 + x2) / 2)
+                            cy = int((y1 + y2) / 2)
+
+                            # drawing the bounding boxes and the ID Labels
+                            cv2.rectangle(frame, (int(x1), int(y1)), (int(x2), int(y2)), (255, 255, 0), 2)
+                            cv2.circle(frame, (cx, cy), 5, (0, 255, 0), -1)
+                            label = f"ID: {Id}"
+                            cv2.putText(frame, label, (int(x1), int(y1) - 10), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (0, 0, 255), 2, cv2.LINE_AA)
+
+                    counted_before = counter.count
+                    if counter.update(boxes, IDs, classes):
+                        for _ in range(counter.count - counted_before):
+                            monitor.crossing(now)
+                        if (now - last_cross_time > 0.5):
+                            time_between_crossings.append(now - last_cross_time)
+                        last_cross_time = now
+
+                    if zone_counter.zones:
+                        zone_counter.update(boxes, IDs, classes, now)
+                elif log_writer:
+                    log_writer.write_frame(frame_count, now)
+
+                # Display object count on frame
+                cv2.putText(frame, f"Count: {counter.count}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                for i, (name, count) in enumerate(zone_counter.counts.items()):
+                    cv2.putText(frame, f"{name}: {count}", (10, 60 + 30 * i), cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 255), 2)
         
-
-        # Display object count on frame
-        cv2.putText(frame, f"Count: {obj_count}", (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-        
-        # Write the processed frame to output video
-        out_video.write(frame)
+                # Write the processed frame to output video
+                out_video.write(frame)
         
-        # Show the preview window
-        display_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)  # Scale down to 50%
+                # Show the preview window
+                display_frame = cv2.resize(frame, (0, 0), fx=0.5, fy=0.5)  # Scale down to 50%
 
-        cv2.imshow("Live Preview", display_frame)
+                cv2.imshow("Live Preview", display_frame)
 
-        if time.time() - start_time >= time_th:
+            now = time.time()
+            changes = []
+            new_state = monitor.update(now)
+            if new_state is not None:
+                changes.append((None, new_state))
+            changes += zone_counter.update_status(now)
 
-            readable_time = time.ctime(time.time())
-            print(obj_count)
-            if obj_count >= obj_per_time - bounds and obj_count <= obj_per_time + bounds:
-                functioning = True
-            elif obj_count > obj_per_time + bounds:
-                with open(out_path, "a") as f:
-                    f.write(f"Too Fast on {readable_time}\n")
-                functioning = False
-            elif obj_count < obj_per_time - bounds and obj_count > 0:
-                with open(out_path, "a") as f:
-                    f.write(f"Too Slow on {readable_time}\n")
-                functioning = False
-            else:
+            if changes:
+                readable_time = time.ctime(now)
                 with open(out_path, "a") as f:
-                    f.write(f"Stopped on {readable_time}\n")
-                functioning = False
-
-
-            print("🔄 status :", functioning, "while global is ", status.functioning)
-            if functioning != status.functioning:
-                try:
-                    print("🔄 Notifying backend of status change:", functioning, "while global is ", status.functioning)
-                    requests.post("http://localhost:8000/internal-update-status", json={"functioning": functioning})
-                except Exception as e:
-                    print("❌ Failed to notify backend:", e)
-
-            obj_count = 0
-            start_time = time.time()
-
-        # Exit on 'q' key press
-        if cv2.waitKey(1) & 0xFF == ord('q'):
-            break
+                    for name, new_state in changes:
+                        prefix = f"{name}: " if name else ""
+                        count = zone_counter.counts[name] if name else counter.count
+                        print(f"{prefix}{new_state} ({count} objects so far)")
+                        f.write(f"{prefix}{new_state} on {readable_time}\n")
+
+                # the backend only knows one status: functioning while every line and zone is running
+                all_functioning = monitor.functioning and all(m.functioning for m in zone_counter.monitors.values())
+                if all_functioning != functioning:
+                    functioning = all_functioning
+                    try:
+                        print("🔄 Notifying backend of status change:", functioning)
+                        requests.post("http://localhost:8000/internal-update-status", json={"functioning": functioning})
+                    except Exception as e:
+                        print("❌ Failed to notify backend:", e)
+
+            # Exit on 'q' key press
+            if cv2.waitKey(1) & 0xFF == ord('q'):
+                break
+    finally:
+        # also on Ctrl-C or a crash, so the processed video and the track log stay readable
+        cap.release()
+        if live:
+            print(f"Dropped {cap.dropped} stale frames, reconnected {cap.reconnects} times")
+        if log_writer:
+            log_writer.close()
+        if out_video is not None:
+            out_video.release()
+        cv2.destroyAllWindows()
 
     print(np.array(time_between_crossings).std())
-
-    # Release resources
-    cap.release()
-
-    out_video.release()
-    cv2.destroyAllWindows()
-
@@ -6,13 +6,11 @@ from dotenv import load_dotenv
 import threading
 import time
 import os
-import httpx
-import asyncio
-import requests
+from functools import lru_cache
 
-from openai import AzureOpenAI
-
-from detector import CameraMotionDetector, recorded_videos_queue, lock
+# OpenCV, the vision components and the OpenAI SDK are imported on first use
+# (see vision() and llm_client()) so the API is serving within a fraction of a second
+from recordings import RecordingIndex, RetentionManager
 from status import functioning as global_functioning, previous_functioning
 
 # === Load environment variables ===
@@ -24,11 +22,21 @@ AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
 AZURE_API_VERSION = os.getenv("AZURE_API_VERSION")
 AZURE_DEPLOYMENT_NAME = os.getenv("AZURE_DEPLOYMENT_NAME")
 
-client = AzureOpenAI(
-    api_key=AZURE_API_KEY,
-    azure_endpoint=AZURE_ENDPOINT,
-    api_version=AZURE_API_VERSION
-)
+@lru_cache(maxsize=None)
+def llm_client():
+    """Created on the first /chat request; fails there (not at import) if Azure is not configured."""
+    from openai import AzureOpenAI
+    return AzureOpenAI(
+        api_key=AZURE_API_KEY,
+        azure_endpoint=AZURE_ENDPOINT,
+        api_version=AZURE_API_VERSION
+    )
+
+@lru_cache(maxsize=None)
+def vision():
+    """The detector module (and with it OpenCV), imported on first use."""
+    import detector
+    return detector
 
 # === FastAPI App ===
 app = FastAPI()
@@ -43,8 +51,17 @@ app.add_middleware(
 
 # === Globals ===
 VIDEO_DIR = "recordings"
+EXPO_PUSH_URL = os.getenv("EXPO_PUSH_URL", "https://exp.host/--/api/v2/push/send")
 expo_push_tokens = set()
-event_loop = asyncio.get_event_loop()
+
+# === Recording index and retention ===
+os.makedirs(VIDEO_DIR, exist_ok=True)
+recording_index = RecordingIndex(VIDEO_DIR)
+retention = RetentionManager(
+    recording_index,
+    max_bytes=float(os.getenv("RECORDINGS_MAX_GB", "5")) * 2**30,
+    max_age_days=float(os.getenv("RECORDINGS_MAX_AGE_DAYS", "7")),
+)
 
 # === Request Models ===
 class NotificationPayload(BaseModel):
@@ -56,6 +73,8 @@ class Message(BaseModel):
 
 # === Internal Functions ===
 def send_push_notification(token, title, body):
+    import requests
+
     message = {
         "to": token,
         "sound": "default",
@@ -63,7 +82,7 @@ def send_push_notification(token, title, body):
         "body": body,
     }
     response = requests.post(
-        "https://exp.host/--/api/v2/push/send",
+        EXPO_PUSH_URL,
         json=message,
         headers={"Content-Type": "application/json"},
     )
@@ -82,6 +101,19 @@ Machine 2: Stopped Tuesday 11:30 AM"""
 
 # === ROUTES ===
 
+@app.on_event("startup")
+def start_background_work():
+    # Nothing slow runs before the server accepts requests: the index sync (which
+    # probes new clips with OpenCV) and the optional vision warm-up run in the background.
+    # The retention thread syncs the index first thing, so it is not synced here as well.
+    if os.getenv("PRELOAD_VISION", "1") == "1":
+        threading.Thread(target=vision, daemon=True).start()
+    retention.start()
+
+@app.on_event("shutdown")
+def stop_recording_index():
+    retention.stop()
+
 @app.post("/internal-update-status")
 async def update_status(request: Request):
     data = await request.json()
@@ -91,6 +123,8 @@ async def update_status(request: Request):
     global global_functioning, previous_functioning
 
     temp_token = "ExponentPushToken[DtaKDBNEHe0CJyforTbFH9]"
+    if not new_status:
+        recording_index.add_event("stoppage")  # Keep the clips around the stoppage
     if new_status:
         send_push_notification(temp_token, "✅ Production Running", "Production line is functioning normally!")
     else:
@@ -98,12 +132,41 @@ async def update_status(request: Request):
 
     return {"message": "Status updated"}
 
+@app.get("/videos")
+def list_videos(start: float = None, end: float = None, camera: str = None, page: int = 1, page_size: int = 50):
+    page = max(page, 1)
+    page_size = min(max(page_size, 1), 500)
+    videos, total = recording_index.list(start=start, end=end, camera=camera, page=page, page_size=page_size)
+    return {"videos": videos, "total": total, "page": page, "page_size": page_size}
+
+def find_video(filename: str):
+    clip = recording_index.get(filename)
+    if clip is None:
+        # Recorded by a detector that is not writing to the index; index it now
+        file_path = os.path.join(VIDEO_DIR, os.path.basename(filename))
+        if not filename.endswith(".mp4") or not os.path.exists(file_path):
+            raise HTTPException(status_code=404, detail="Video not found")
+        recording_index.add(file_path)
+        clip = recording_index.get(os.path.basename(filename))
+    if clip is None or not os.path.exists(os.path.join(VIDEO_DIR, clip["filename"])):
+        # Deleted since it was indexed (e.g. by hand); the next sync would drop it too
+        if clip is not None:
+            recording_index._forget([clip["filename"]])
+        raise HTTPException(status_code=404, detail="Video not found")
+    return clip
+
 @app.get("/videos/{filename}")
 def get_video(filename: str):
-    file_path = os.path.join(VIDEO_DIR, filename)
-    if not os.path.exists(file_path):
-        raise HTTPException(status_code=404, detail="Video not found")
-    return FileResponse(path=file_path, media_type='video/mp4')
+    clip = find_video(filename)
+    return FileResponse(path=os.path.join(VIDEO_DIR, clip["filename"]), media_type='video/mp4')
+
+@app.get("/videos/{filename}/thumbnail")
+def get_video_thumbnail(filename: str):
+    clip = find_video(filename)
+    thumbnail_path = os.path.join(recording_index.thumbnail_path, clip["thumbnail"] or "")
+    if not clip["thumbnail"] or not os.path.exists(thumbnail_path):
+        raise HTTPException(status_code=404, detail="Thumbnail not found")
+    return FileResponse(path=thumbnail_path, media_type='image/jpeg')
 
 @app.post("/send-notification")
 async def send_notification(payload: NotificationPayload):
@@ -122,10 +185,22 @@ async def register_token(request: Request):
     return {"message": "No token provided"}
 
 @app.get("/new-videos")
-def get_new_videos():
-    with lock:
-        videos = list(recorded_videos_queue)
-        recorded_videos_queue.clear()
+def get_new_videos(since: float = None, after: str = "", limit: int = 500):
+    if since is not None:
+        # Clips from any process, as recorded in the index, oldest first. Ask again with
+        # since=next_since&after=next_after for the clips after these (while "more" is
+        # true, there are some already).
+        videos, more = recording_index.started_after(since, after, limit=min(max(limit, 1), 500))
+        return {
+            "new_videos": [v["filename"] for v in videos],
+            "next_since": videos[-1]["start_time"] if videos else since,
+            "next_after": videos[-1]["filename"] if videos else after,
+            "more": more,
+        }
+    detector = vision()
+    with detector.lock:
+        videos = list(detector.recorded_videos_queue)
+        detector.recorded_videos_queue.clear()
     return {"new_videos": [os.path.basename(v) for v in videos]}
 
 @app.get("/status")
@@ -159,7 +234,7 @@ async def chat_with_openai(msg: Message):
 
     try:
         # Initial response with potential function call
-        response = client.chat.completions.create(
+        response = llm_client().chat.completions.create(
             model=AZURE_DEPLOYMENT_NAME,
             messages=messages,
             functions=functions,
@@ -184,7 +259,7 @@ async def chat_with_openai(msg: Message):
                 "content": str(function_response)
             })
 
-            final_response = client.chat.completions.create(
+            final_response = llm_client().chat.completions.create(
                 model=AZURE_DEPLOYMENT_NAME,
                 messages=messages
             )
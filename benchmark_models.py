@@ -0,0 +1,205 @@
+"""
+Accuracy / latency comparison of the registered YOLO models.
+
+For every model in model_registry this measures:
+- mAP50 and mAP50-95 per class on the test and valid splits of the training data
+- crossing-count error on recorded clips with a known object count
+- ms/frame for several input sizes and CPU thread counts
+- process memory (RSS): before / after loading the model and peak while
+  predicting at each input size, measured in a fresh process per model
+
+Results are written as one long table (model, benchmark, setting, metric, value)
+to CSV so runs can be compared or loaded into pandas.
+
+Example:
+    python benchmark_models.py --clip Dataset/Video/line1.mp4:42 --targets 2
+"""
+
+import argparse
+import csv
+import glob
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import cv2
+import numpy as np
+
+from model_registry import registry, load_yolo
+from virtual_line import LineCounter
+
+DATA_YAML = "Our_Models/Model1/Model_Training_Data/data.yaml"
+CLASS_NAMES = ["Box", "Fruit", "bag", "bottle", "jar", "mask", "pallet"]
+
+
+def trained_on_our_classes(model):
+    return list(model.names.values()) == CLASS_NAMES
+
+
+def accuracy(model, data, split, imgsz):
+    """Per-class mAP on one dataset split; None when the model has other classes."""
+    if not trained_on_our_classes(model):
+        return None
+    metrics = model.val(data=data, split=split, imgsz=imgsz, plots=False, verbose=False)
+    rows = {"all": {"mAP50": metrics.box.map50, "mAP50-95": metrics.box.map}}
+    # ap50 / ap are only reported for classes present in the split
+    for index, class_id in enumerate(metrics.box.ap_class_index):
+        rows[CLASS_NAMES[int(class_id)]] = {
+            "mAP50": metrics.box.ap50[index],
+            "mAP50-95": metrics.box.ap[index],
+        }
+    return rows
+
+
+def count_error(name, video_path, true_count, line, factor, targets, imgsz):
+    """Run tracking over a clip and compare the line count with the true count."""
+    model = registry.tracker(name)
+    cap = cv2.VideoCapture(video_path)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    counter = LineCounter(line, factor, width, height, targets)
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        results = model.track(source=frame, conf=0.1, iou=0.5, imgsz=imgsz, show=False,
+                              persist=True, tracker="botsort.yaml", verbose=False)
+        if results[0].boxes.id is not None:
+            counter.update(results[0].boxes.xyxy.cpu().numpy(),
+                           results[0].boxes.id.cpu().numpy(),
+                           results[0].boxes.cls.cpu().numpy())
+    cap.release()
+    return counter.count - true_count
+
+
+def latency(model, images, imgsz, threads, warmup=3):
+    """Median ms/frame of predict() on CPU."""
+    import torch
+
+    torch.set_num_threads(threads)
+    for image in images[:warmup]:
+        model.predict(image, imgsz=imgsz, device="cpu", verbose=False)
+
+    timings = []
+    for image in images:
+        start = time.perf_counter()
+        model.predict(image, imgsz=imgsz, device="cpu", verbose=False)
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def _measure_memory(weights_path, image_paths, imgszs, interval=0.005):
+    """Runs in a fresh process, so other loaded models do not count."""
+    import psutil  # installed with ultralytics
+
+    process = psutil.Process()
+    images = [cv2.imread(path) for path in image_paths]
+    import ultralytics  # noqa: F401  the libraries are not part of the model's footprint
+
+    def rss_mb():
+        return process.memory_info().rss / 2**20
+
+    result = {"rss_before_load_mb": rss_mb()}
+    model = load_yolo(weights_path)
+    model.predict(images[0], imgsz=imgszs[0], device="cpu", verbose=False)  # builds the predictor
+    result["rss_loaded_mb"] = rss_mb()
+
+    # smallest input first: memory the allocator keeps from a larger size would
+    # otherwise hide the peak of a smaller one
+    for imgsz in sorted(imgszs):
+        peak = [rss_mb()]
+        done = threading.Event()
+
+        def sample():
+            while not done.wait(interval):
+                peak[0] = max(peak[0], rss_mb())
+
+        sampler = threading.Thread(target=sample, daemon=True)
+        sampler.start()
+        for image in images:
+            model.predict(image, imgsz=imgsz, device="cpu", verbose=False)
+        done.set()
+        sampler.join()
+        result[f"rss_peak_imgsz={imgsz}_mb"] = max(peak[0], rss_mb())
+    return result
+
+
+def memory(name, image_paths, imgszs):
+    """RSS before / after loading and peak RSS during inference at each imgsz (MB)."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure_memory, registry.paths[name], image_paths, imgszs).result()
+
+
+def run(names, data, splits, clips, line, factor, targets, imgszs, threads_list, frames):
+    test_images = sorted(glob.glob(os.path.join(os.path.dirname(data), "test", "images", "*.jpg")))[:frames]
+    images = [cv2.imread(path) for path in test_images]
+    rows = []
+
+    for name in names:
+        print(f"📊 Benchmarking {name}")
+        for metric, value in memory(name, test_images, imgszs).items():
+            rows.append((name, "memory", "", metric, value))
+
+        model = registry.get(name)
+
+        for split in splits:
+            per_class = accuracy(model, data, split, imgszs[0])
+            if per_class is None:
+                print(f"⚠️  {name} was not trained on {CLASS_NAMES}, skipping mAP")
+                break
+            for class_name, metrics in per_class.items():
+                for metric, value in metrics.items():
+                    rows.append((name, f"map_{split}", class_name, metric, float(value)))
+
+        if clips and not trained_on_our_classes(model):
+            # the target ids mean other classes for these weights (2 is "car" in COCO)
+            print(f"⚠️  {name} was not trained on {CLASS_NAMES}, skipping count error")
+            clips_for_model = {}
+        else:
+            clips_for_model = clips
+        for video_path, true_count in clips_for_model.items():
+            error = count_error(name, video_path, true_count, line, factor, targets, imgszs[0])
+            rows.append((name, "count", os.path.basename(video_path), "count_error", error))
+
+        for imgsz in imgszs:
+            for threads in threads_list:
+                ms = latency(model, images, imgsz, threads)
+                rows.append((name, "latency", f"imgsz={imgsz},threads={threads}", "ms_per_frame", ms))
+
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare the registered models on accuracy and speed")
+    parser.add_argument("--models", nargs="+", default=registry.names())
+    parser.add_argument("--data", default=DATA_YAML)
+    parser.add_argument("--splits", nargs="+", default=["test", "val"])
+    parser.add_argument("--clip", action="append", default=[],
+                        help="video and true object count as path:count (repeatable)")
+    parser.add_argument("--horizontal", action="store_true", help="use a horizontal line (default vertical)")
+    parser.add_argument("--factor", type=float, default=0.35)
+    parser.add_argument("--targets", type=int, nargs="+", default=[0, 1, 2, 3, 4, 5, 6])
+    parser.add_argument("--imgsz", type=int, nargs="+", default=[640, 480, 320])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--frames", type=int, default=20, help="test images used for timing and peak memory")
+    parser.add_argument("--out", default="Results/model_benchmark.csv")
+    args = parser.parse_args()
+
+    clips = {}
+    for clip in args.clip:
+        path, count = clip.rsplit(":", 1)
+        clips[path] = int(count)
+
+    rows = run(args.models, args.data, args.splits, clips, args.horizontal, args.factor,
+               args.targets, args.imgsz, args.threads, args.frames)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["model", "benchmark", "setting", "metric", "value"])
+        writer.writerows(rows)
+    print(f"✅ Wrote {len(rows)} rows to {args.out}")
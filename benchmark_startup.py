@@ -0,0 +1,70 @@
+"""
+Backend cold-start benchmark.
+
+Starts `uvicorn backend:app` in a fresh process several times and measures:
+- import time of backend.py (python -X importtime, top-level total)
+- time from process start until GET /status answers
+
+Example:
+    python benchmark_startup.py --runs 5
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+
+
+def import_time():
+    """Seconds spent importing backend in a fresh interpreter."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", "import backend"],
+                            capture_output=True, text=True)
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == "backend":
+            return int(parts[1]) / 1e6
+    raise RuntimeError(f"Could not import backend:\n{result.stderr[-2000:]}")
+
+
+def time_to_status(port, timeout=60):
+    """Seconds from launching uvicorn until /status returns 200."""
+    url = f"http://127.0.0.1:{port}/status"
+    start = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "-m", "uvicorn", "backend:app", "--port", str(port)],
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        while time.perf_counter() - start < timeout:
+            try:
+                with urllib.request.urlopen(url, timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - start
+            except OSError:
+                time.sleep(0.01)
+        raise TimeoutError(f"/status did not answer within {timeout}s")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure backend cold-start time")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    imports = [import_time() for _ in range(args.runs)]
+    ready = [time_to_status(args.port) for _ in range(args.runs)]
+
+    report = {
+        "runs": args.runs,
+        "import_s_median": round(statistics.median(imports), 3),
+        "status_ready_s_median": round(statistics.median(ready), 3),
+        "status_ready_s_max": round(max(ready), 3),
+    }
+    print(json.dumps(report, indent=2))
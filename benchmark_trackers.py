@@ -0,0 +1,136 @@
+"""
+Count accuracy and per-frame tracking cost: ConveyorTracker vs BoT-SORT.
+
+Track logs (--log): the boxes BoT-SORT tracked live are fed, without their
+ids, to ConveyorTracker. Both are counted with the same line, so no inference
+is needed. Only ConveyorTracker's cost is timed this way: the log does not
+hold BoT-SORT's tracking time, so compare costs on --video clips.
+
+Videos (--video): every frame is detected once for ConveyorTracker and run
+through model.track() with botsort.yaml; BoT-SORT's tracking cost is the
+track() time minus the plain detection time.
+
+Example:
+    python benchmark_trackers.py --log logs/tracks.bin:42 --video test.mp4:42 --targets 2
+"""
+
+import argparse
+import csv
+import os
+import time
+
+from model_registry import registry, DEFAULT_MODEL
+from track_log import TrackLog, crossing_times
+from trackers import ConveyorTracker
+from virtual_line import LineCounter
+
+
+def parse_clip(clip):
+    """path or path:true_count"""
+    path, _, count = clip.rpartition(":")
+    if path and count.isdigit():
+        return path, int(count)
+    return clip, None
+
+
+def bench_log(path, line, factor, targets):
+    log = TrackLog(path)
+    tracker = ConveyorTracker(axis=1 if line else 0)
+    counter = LineCounter(line, factor, log.width, log.height, targets)
+    elapsed = 0.0
+    for i in range(len(log)):
+        frame = log.frame(i)
+        begin = time.perf_counter()
+        boxes, ids, classes, _ = tracker.update(frame["box"], frame["cls"], frame["conf"])
+        elapsed += time.perf_counter() - begin
+        counter.update(boxes, ids, classes)
+
+    frames = max(len(log), 1)
+    # BoT-SORT ran live when the log was recorded; its cost is only measured by bench_video
+    botsort_count = len(crossing_times(log, line, factor, targets))
+    return [
+        ("botsort", botsort_count, None),
+        ("conveyor", counter.count, elapsed / frames * 1000),
+    ]
+
+
+def bench_video(path, line, factor, targets, model_name):
+    import cv2
+
+    detector = registry.tracker(model_name)
+    botsort = registry.tracker(model_name)
+    cap = cv2.VideoCapture(path)
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+
+    tracker = ConveyorTracker(axis=1 if line else 0)
+    conveyor_counter = LineCounter(line, factor, width, height, targets)
+    botsort_counter = LineCounter(line, factor, width, height, targets)
+    detect_time = conveyor_time = track_time = 0.0
+    frames = 0
+
+    while cap.isOpened():
+        ret, frame = cap.read()
+        if not ret:
+            break
+        frames += 1
+
+        begin = time.perf_counter()
+        detections = detector.predict(source=frame, conf=0.1, iou=0.5, verbose=False)[0].boxes
+        boxes = detections.xyxy.cpu().numpy()
+        classes = detections.cls.cpu().numpy()
+        confs = detections.conf.cpu().numpy()
+        detect_time += time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        boxes, ids, classes, _ = tracker.update(boxes, classes, confs)
+        conveyor_time += time.perf_counter() - begin
+        conveyor_counter.update(boxes, ids, classes)
+
+        begin = time.perf_counter()
+        results = botsort.track(source=frame, conf=0.1, iou=0.5, persist=True, tracker="botsort.yaml", verbose=False)
+        track_time += time.perf_counter() - begin
+        if results[0].boxes.id is not None:
+            botsort_counter.update(results[0].boxes.xyxy.cpu().numpy(),
+                                   results[0].boxes.id.cpu().numpy(),
+                                   results[0].boxes.cls.cpu().numpy())
+    cap.release()
+
+    frames = max(frames, 1)
+    return [
+        ("botsort", botsort_counter.count, max(track_time - detect_time, 0) / frames * 1000),
+        ("conveyor", conveyor_counter.count, conveyor_time / frames * 1000),
+    ]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare ConveyorTracker with BoT-SORT")
+    parser.add_argument("--log", action="append", default=[], help="track log, optionally path:true_count")
+    parser.add_argument("--video", action="append", default=[], help="video, optionally path:true_count")
+    parser.add_argument("--model", default=DEFAULT_MODEL)
+    parser.add_argument("--horizontal", action="store_true", help="use a horizontal line (default vertical)")
+    parser.add_argument("--factor", type=float, default=0.35)
+    parser.add_argument("--targets", type=int, nargs="+", default=[0, 1, 2, 3, 4, 5, 6])
+    parser.add_argument("--out", default="Results/tracker_benchmark.csv")
+    args = parser.parse_args()
+
+    rows = []
+    for kind, clips in (("log", args.log), ("video", args.video)):
+        for clip in clips:
+            path, true_count = parse_clip(clip)
+            if kind == "log":
+                results = bench_log(path, args.horizontal, args.factor, args.targets)
+            else:
+                results = bench_video(path, args.horizontal, args.factor, args.targets, args.model)
+            for tracker_name, count, ms in results:
+                error = count - true_count if true_count is not None else None
+                rows.append((os.path.basename(path), kind, tracker_name, count, true_count, error, ms))
+                cost = f"{ms:.3f} ms/frame" if ms is not None else "cost not measured on track logs, see --video"
+                print(f"📊 {os.path.basename(path)} [{kind}] {tracker_name}: count {count}, error {error}, {cost}")
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["clip", "source", "tracker", "count", "true_count", "count_error", "ms_per_frame"])
+        writer.writerows(rows)
+    print(f"✅ Wrote {len(rows)} rows to {args.out}")
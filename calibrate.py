@@ -0,0 +1,171 @@
+"""
+Auto-calibration of the virtual-line settings used in main.py.
+
+Takes one track log per line (recorded with OperationStatus(..., track_log=...))
+together with the true number of objects that passed in that clip, and grid
+searches line orientation, factor, cross_threshold, obj_per_time and bounds
+against the cached tracks. Candidates are evaluated in parallel worker
+processes; no YOLO inference is needed.
+
+The clip is assumed to show normal production, so the status settings are
+scored by how long the replay reports anything other than Running.
+
+Example:
+    python calibrate.py --clip logs/line1.bin:42 --clip logs/line2.bin:17 --targets 2
+"""
+
+import argparse
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from itertools import product
+
+import numpy as np
+
+from throughput import RUNNING, min_cross_threshold
+from track_log import TrackLog, crossing_times, replay_statuses
+
+FACTORS = np.round(np.arange(0.1, 0.91, 0.05), 2).tolist()
+# ThroughputMonitor only compares time_th / interval with obj_per_time +- bounds,
+# and both scale with time_th, so time_th does not change any status: it is
+# fixed to the usual 30 s window instead of searched.
+TIME_TH = 30
+BOUND_FRACTIONS = [0.2, 0.35, 0.5]  # bounds as a fraction of obj_per_time
+STOP_MULTIPLIERS = [1.25, 1.5, 2]  # cross_threshold as a multiple of the slowest allowed gap
+
+_logs = {}
+
+
+def _load_logs(paths):
+    for path in paths:
+        _logs[path] = TrackLog(path)
+
+
+def _not_running_fraction(events, duration):
+    """Share of the clip spent in a state other than Running."""
+    if duration <= 0:
+        return 0.0
+    bad = 0.0
+    state, since = RUNNING, 0.0
+    for timestamp, new_state in events + [(duration, None)]:
+        if state != RUNNING:
+            bad += timestamp - since
+        state, since = new_state, timestamp
+    return bad / duration
+
+
+def evaluate_line(args):
+    """Count error for one (clip, orientation, factor) candidate."""
+    path, true_count, targets, clock, line, factor = args
+    count = len(crossing_times(_logs[path], line, factor, targets, clock))
+    return abs(count - true_count), line, factor
+
+
+def evaluate_status(args):
+    """Time spent not Running for one set of status settings."""
+    path, targets, clock, line, factor, obj_per_time, time_th, bounds, cross_threshold = args
+    log = _logs[path]
+    crossings = crossing_times(log, line, factor, targets, clock)
+    events = replay_statuses(log, crossings, cross_threshold, obj_per_time, time_th, bounds, clock)
+    times = log.times(clock)
+    duration = float(times[-1]) if len(times) else 0.0
+    return _not_running_fraction(events, duration), time_th, bounds, cross_threshold, obj_per_time
+
+
+def calibrate(clips, targets, clock="log", workers=None):
+    """
+    Find the best settings for every clip.
+
+    clips: {track log path: true object count}
+    Returns {line name: config dict with the OperationStatus arguments}.
+    """
+    paths = list(clips)
+    best = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_load_logs, initargs=(paths,)) as pool:
+        _load_logs(paths)
+
+        for path, true_count in clips.items():
+            log = _logs[path]
+            times = log.times(clock)
+            duration = float(times[-1]) if len(times) else 0.0
+            name = os.path.splitext(os.path.basename(path))[0]
+
+            # 1. line position: minimize the count error
+            candidates = [(path, true_count, targets, clock, line, factor)
+                          for line, factor in product([False, True], FACTORS)]
+            results = list(pool.map(evaluate_line, candidates, chunksize=8))
+            error = min(r[0] for r in results)
+            tied = [r for r in results if r[0] == error]
+            # several positions usually give the same count: keep the orientation
+            # with the widest range of such positions and take the middle one
+            line = max([False, True], key=lambda o: sum(r[1] == o for r in tied))
+            tied = [r for r in tied if r[1] == line]
+            _, line, factor = tied[len(tied) // 2]
+
+            if true_count == 0 or duration <= 0:
+                print(f"⚠️  {name}: no objects or empty clip, status settings not calibrated")
+                best[name] = {"line": line, "factor": factor, "targets": targets, "count_error": error}
+                continue
+
+            # 2. status settings around the observed production rate
+            time_th = TIME_TH
+            obj_per_time = round(true_count / duration * time_th, 2)
+            gap = duration / true_count
+            candidates = []
+            for fraction, multiplier in product(BOUND_FRACTIONS, STOP_MULTIPLIERS):
+                bounds = round(max(obj_per_time * fraction, 0.5), 2)
+                # longer than the gap at the lowest allowed rate, or Too Slow could never show
+                slowest_gap = min_cross_threshold(obj_per_time, time_th, bounds) or gap
+                cross_threshold = round(slowest_gap * multiplier, 1)
+                if cross_threshold <= min_cross_threshold(obj_per_time, time_th, bounds):
+                    continue
+                candidates.append((path, targets, clock, line, factor,
+                                   obj_per_time, time_th, bounds, cross_threshold))
+            if not candidates:
+                print(f"⚠️  {name}: no valid status settings for this rate, status settings not calibrated")
+                best[name] = {"line": line, "factor": factor, "targets": targets, "count_error": error}
+                continue
+            results = list(pool.map(evaluate_status, candidates, chunksize=4))
+            # least time in a false alarm, then the tightest settings (faster alerts)
+            score, time_th, bounds, cross_threshold, obj_per_time = min(
+                results, key=lambda r: (round(r[0], 3), r[3], r[2] / r[4], r[1]))
+
+            best[name] = {
+                "line": line,
+                "factor": factor,
+                "cross_threshold": cross_threshold,
+                "targets": targets,
+                "obj_per_time": obj_per_time,
+                "time_th": time_th,
+                "bounds": bounds,
+                "count_error": error,
+                "not_running_fraction": round(score, 3),
+            }
+            print(f"✅ {name}: count error {error}, not running {score:.1%} of the clip")
+
+    return best
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Calibrate virtual-line settings from track logs")
+    parser.add_argument("--clip", action="append", required=True,
+                        help="track log and true object count as path:count (repeat per line)")
+    parser.add_argument("--targets", type=int, nargs="+", default=[0, 1, 2, 3, 4, 5, 6])
+    parser.add_argument("--clock", choices=["log", "video"], default="log",
+                        help="log: timestamps recorded live (use for live sources, which drop frames), "
+                             "video: frame number / fps")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--out", default="logs/calibration.json")
+    args = parser.parse_args()
+
+    clips = {}
+    for clip in args.clip:
+        path, count = clip.rsplit(":", 1)
+        clips[path] = int(count)
+
+    best = calibrate(clips, args.targets, args.clock, args.workers)
+
+    os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+    with open(args.out, "w") as f:
+        json.dump(best, f, indent=2)
+    print(json.dumps(best, indent=2))
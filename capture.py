@@ -0,0 +1,123 @@
+import threading
+import time
+
+import cv2
+
+
+def is_live_source(source):
+    """Webcam indices and network streams are live; anything else is treated as a file."""
+    if isinstance(source, int):
+        return True
+    source = str(source)
+    return source.isdigit() or source.lower().startswith(("rtsp://", "rtmp://", "http://", "https://", "udp://"))
+
+
+class LatestFrameCapture:
+    """
+    Drop-in replacement for cv2.VideoCapture on live sources.
+
+    A grabber thread reads the camera as fast as it delivers frames and keeps
+    only the newest one, so a slow consumer always processes the current frame
+    instead of working through a growing driver / RTSP buffer. Frames replaced
+    before anyone read them are counted in `dropped`. When the stream is lost
+    the grabber reopens it with exponential backoff.
+    """
+
+    def __init__(self, source, settings=None, min_backoff=0.5, max_backoff=10.0, name="Capture"):
+        # source: camera index or stream url, as for cv2.VideoCapture
+        # settings: {cv2.CAP_PROP_*: value} applied after every (re)connect
+        self.source = int(source) if str(source).isdigit() else source
+        self.settings = settings or {}
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.name = name
+
+        self.cap = None
+        self.frame = None
+        self.frame_index = 0  # frames grabbed from the source so far
+        self.read_index = 0  # index of the last frame handed out
+        self.dropped = 0
+        self.reconnects = 0
+        self.running = True
+        self.condition = threading.Condition()
+
+        self._open()
+        self.thread = threading.Thread(target=self._grab_loop, daemon=True)
+        self.thread.start()
+
+    def _open(self):
+        cap = cv2.VideoCapture(self.source)
+        for prop, value in self.settings.items():
+            cap.set(prop, value)
+        if not cap.isOpened():
+            cap.release()
+            return False
+        self.cap = cap
+        return True
+
+    def _reconnect(self):
+        backoff = self.min_backoff
+        while self.running:
+            print(f"{self.name}: Stream lost, reconnecting in {backoff:.1f}s...")
+            time.sleep(backoff)
+            if self._open():
+                self.reconnects += 1
+                print(f"{self.name}: Reconnected to {self.source}")
+                return
+            backoff = min(backoff * 2, self.max_backoff)
+
+    def _grab_loop(self):
+        while self.running:
+            if self.cap is None:
+                self._reconnect()
+                continue
+
+            ret, frame = self.cap.read()
+            if not ret:
+                self.cap.release()
+                self.cap = None
+                continue
+
+            with self.condition:
+                if self.frame is not None and self.read_index < self.frame_index:
+                    self.dropped += 1
+                self.frame = frame
+                self.frame_index += 1
+                self.condition.notify_all()
+
+        if self.cap is not None:
+            self.cap.release()
+
+    def read(self, timeout=1.0):
+        """
+        Wait for a frame newer than the last one returned, like cap.read().
+
+        Returns (False, None) if none arrives within `timeout` seconds, e.g.
+        while the stream is reconnecting, or after release().
+        """
+        with self.condition:
+            fresh = self.condition.wait_for(lambda: self.frame_index > self.read_index or not self.running,
+                                            timeout)
+            if not fresh or not self.running:
+                return False, None
+            self.read_index = self.frame_index
+            return True, self.frame
+
+    def isOpened(self):
+        return self.running
+
+    def get(self, prop):
+        cap = self.cap
+        return cap.get(prop) if cap is not None else 0
+
+    def set(self, prop, value):
+        self.settings[prop] = value
+        cap = self.cap
+        return cap.set(prop, value) if cap is not None else False
+
+    def release(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread is not threading.current_thread():
+            self.thread.join(timeout=2)
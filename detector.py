@@ -4,6 +4,7 @@ import threading
 import time
 import os
 from collections import deque # For buffering frames
+from capture import LatestFrameCapture
 import asyncio
 # from notifications import send_push_notification
 
@@ -24,9 +25,11 @@ lock = threading.Lock()
 
 # --- Motion Detector Class ---
 class CameraMotionDetector(threading.Thread):
-    def __init__(self, record_path="recordings", min_motion_area=1500, fps=30, resolution=(640, 480)):
+    def __init__(self, record_path="recordings", min_motion_area=1500, fps=30, resolution=(640, 480), index=None, camera="camera0"):
         super().__init__()
         self.record_path = record_path
+        self.index = index # Optional recordings.RecordingIndex that finished clips are added to
+        self.camera = camera
         self.min_motion_area = min_motion_area
         self.fps = fps
         self.resolution = resolution
@@ -46,29 +49,31 @@ class CameraMotionDetector(threading.Thread):
     def run(self):
         global motion_detected_flag, frame_buffer, recorded_videos_queue
 
-        cap = cv2.VideoCapture(0)
-        if not cap.isOpened():
-            print("MotionDetector: Error: Could not open webcam.")
-            for i in range(1, 5): # Try indices 1, 2, 3, 4
-                print(f"MotionDetector: Trying camera index {i}...")
-                cap = cv2.VideoCapture(i)
-                if cap.isOpened():
-                    print(f"MotionDetector: Successfully opened camera with index {i}")
-                    break
-                else:
-                    print(f"MotionDetector: Failed to open camera with index {i}")
-                    cap.release() # Release if it couldn't open
-                    time.sleep(0.5) # Small delay before trying next
-            
-            if not cap or not cap.isOpened():
-                print("MotionDetector: Persistent Error: Could not open any webcam. Exiting thread.")
-                self.running = False
-                return
-            # --- End camera index testing loop ---
+        camera_index = None
+        for i in range(0, 5): # Try indices 0, 1, 2, 3, 4
+            print(f"MotionDetector: Trying camera index {i}...")
+            probe = cv2.VideoCapture(i)
+            opened = probe.isOpened()
+            probe.release() # The grabber thread opens its own handle
+            if opened:
+                print(f"MotionDetector: Successfully opened camera with index {i}")
+                camera_index = i
+                break
+            print(f"MotionDetector: Failed to open camera with index {i}")
+            time.sleep(0.5) # Small delay before trying next
+
+        if camera_index is None:
+            print("MotionDetector: Persistent Error: Could not open any webcam. Exiting thread.")
+            self.running = False
+            return
 
+        # Grab frames on a separate thread and always process the newest one, so a slow
+        # loop never falls behind the camera; lost streams are reopened with backoff.
         # Set camera resolution (optional, might not be supported by all cameras)
-        cap.set(cv2.CAP_PROP_FRAME_WIDTH, self.resolution[0])
-        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, self.resolution[1])
+        cap = LatestFrameCapture(camera_index, settings={
+            cv2.CAP_PROP_FRAME_WIDTH: self.resolution[0],
+            cv2.CAP_PROP_FRAME_HEIGHT: self.resolution[1],
+        }, name="MotionDetector")
         
         # Initialize background subtractor
         fgbg = cv2.createBackgroundSubtractorMOG2(history=500, varThreshold=1000, detectShadows=False)
@@ -79,8 +84,11 @@ class CameraMotionDetector(threading.Thread):
         while self.running:
             ret, frame = cap.read()
             if not ret:
-                print("MotionDetector: Failed to grab frame. Releasing camera.")
-                break
+                # No new frame yet (e.g. the stream is reconnecting); keep the windows
+                # responsive, check self.running and wait again
+                if self.quit_requested():
+                    break
+                continue
 
             # Add current frame to buffer
             frame_buffer.append(frame.copy()) # Append a copy to avoid modification issues
@@ -158,27 +166,38 @@ class CameraMotionDetector(threading.Thread):
                     last_recorded_file = video_filename # Use the pre-constructed filename
                     with lock:
                         recorded_videos_queue.append(last_recorded_file)
+
+                    if self.index is not None:
+                        # The clip starts with the buffered frames from before motion was confirmed
+                        clip_start = self.recording_start_time - len(frame_buffer) / self.fps
+                        try:
+                            self.index.add(last_recorded_file, camera=self.camera, start_time=clip_start, end_time=time.time())
+                        except Exception as e:
+                            print(f"MotionDetector: Could not index {last_recorded_file}: {e}")
                     
                     self.video_writer = None
                     self.recording_start_time = None
                     print("MotionDetector: Video writer released.")
             
-            # Small delay to avoid 100% CPU usage if not processing fast enough
-            time.sleep(0.01) 
-
-            # Check for 'q' key press to quit from the imshow window
-            # This needs to be checked in the same thread that calls imshow
-            if cv2.waitKey(1) & 0xFF == ord('q'):
-                print("MotionDetector: 'q' pressed. Stopping camera loop.")
-                self.running = False # Set running to False to exit loop
+            if self.quit_requested():
                 break # Exit the while loop
 
         cap.release()
+        print(f"MotionDetector: Dropped {cap.dropped} stale frames, reconnected {cap.reconnects} times.")
         if self.video_writer:
             self.video_writer.release()
         cv2.destroyAllWindows() # Close all OpenCV windows
         print("MotionDetector: Camera loop stopped.")
 
+    def quit_requested(self):
+        # Check for 'q' key press to quit from the imshow window
+        # This needs to be checked in the same thread that calls imshow
+        if cv2.waitKey(1) & 0xFF == ord('q'):
+            print("MotionDetector: 'q' pressed. Stopping camera loop.")
+            self.running = False # Set running to False to exit loop
+            return True
+        return False
+
     def stop(self):
         self.running = False
 
@@ -189,7 +208,9 @@ if __name__ == "__main__":
         os.makedirs("recordings")
         print("Created 'recordings' directory for standalone test.")
 
-    detector = CameraMotionDetector(record_path="recordings", min_motion_area=1500)
+    from recordings import RecordingIndex
+    # Finished clips go straight into the index the backend lists and cleans up
+    detector = CameraMotionDetector(record_path="recordings", min_motion_area=1500, index=RecordingIndex("recordings"))
     detector.start()
     try:
         # This main thread loop is now just for observing shared state,
@@ -0,0 +1,309 @@
+"""
+Load test for backend.py with local stand-ins for the external services.
+
+`python load_test.py` does everything in one go:
+1. starts stub servers for the Expo push API and the Azure OpenAI endpoint,
+   each with configurable latency and error rate
+2. starts the backend (uvicorn, separate process) pointed at the stubs, with an
+   event-loop lag monitor installed
+3. drives a weighted mix of /status, /new-videos, /videos/{filename}, /chat,
+   /register-token, /send-notification and /internal-update-status with a
+   number of concurrent virtual phones
+4. reports throughput, latency percentiles per endpoint, errors and how long
+   the backend's event loop was blocked, as JSON
+
+Example:
+    python load_test.py --users 50 --duration 30 --llm-latency 0.8 --push-error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from abc import ABC, abstractmethod
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_MIX = {
+    "status": 40,
+    "new_videos": 25,
+    "video": 10,
+    "register_token": 10,
+    "chat": 10,
+    "send_notification": 3,
+    "internal_update_status": 2,
+}
+
+# named after the time of the run: the backend's retention deletes clips older than a week
+SAMPLE_VIDEO = time.strftime("motion_%Y%m%d_%H%M%S.mp4")
+
+
+# === Stub servers ===
+
+class StubHandler(BaseHTTPRequestHandler, ABC):
+    """Answers every POST after `latency` seconds, failing with 500 at `error_rate`."""
+    latency = 0.0
+    error_rate = 0.0
+
+    @abstractmethod
+    def respond(self):
+        """JSON body of a successful answer."""
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        time.sleep(random.uniform(0.5, 1.5) * self.latency)
+        if random.random() < self.error_rate:
+            status, body = 500, {"error": {"message": "stub error"}}
+        else:
+            status, body = 200, self.respond()
+        payload = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ExpoPushStub(StubHandler):
+    def respond(self):
+        return {"data": {"status": "ok", "id": f"stub-{random.getrandbits(32):x}"}}
+
+
+class AzureOpenAIStub(StubHandler):
+    function_call_rate = 0.0
+
+    def respond(self):
+        if random.random() < self.function_call_rate:
+            message = {"role": "assistant", "content": None,
+                       "function_call": {"name": "get_machine_status", "arguments": "{}"}}
+        else:
+            message = {"role": "assistant", "content": "The production line is running normally."}
+        return {
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": "stub",
+            "choices": [{"index": 0, "finish_reason": "stop", "message": message}],
+            "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+        }
+
+
+def start_stub(handler, latency, error_rate, **attributes):
+    """Run a stub on a free local port in a background thread; returns its base url."""
+    handler = type(handler.__name__, (handler,), dict(latency=latency, error_rate=error_rate, **attributes))
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f"http://127.0.0.1:{server.server_address[1]}", server
+
+
+# === Instrumented backend (runs in its own process) ===
+
+def serve(port, interval=0.01):
+    """Run backend.app with an event-loop lag monitor exposed at /__loadtest/lag."""
+    import uvicorn
+    import backend
+
+    lag = {"samples": 0, "blocked_s": 0.0, "max_s": 0.0}
+
+    async def monitor():
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + interval
+            await asyncio.sleep(interval)
+            late = loop.time() - expected
+            lag["samples"] += 1
+            lag["max_s"] = max(lag["max_s"], late)
+            if late > interval:  # anything beyond scheduling noise means the loop was blocked
+                lag["blocked_s"] += late
+
+    @backend.app.on_event("startup")
+    async def start_monitor():
+        asyncio.get_running_loop().create_task(monitor())
+
+    @backend.app.get("/__loadtest/lag")
+    def get_lag():
+        return lag
+
+    uvicorn.run(backend.app, host="127.0.0.1", port=port, log_level="warning")
+
+
+def wait_until_up(url, timeout=60):
+    start = time.time()
+    while time.time() - start < timeout:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return
+        except OSError:
+            time.sleep(0.05)
+    raise TimeoutError(f"{url} did not come up within {timeout}s")
+
+
+# === Load driver ===
+
+async def request(client, kind):
+    if kind == "status":
+        return await client.get("/status")
+    if kind == "new_videos":
+        return await client.get("/new-videos")
+    if kind == "video":
+        return await client.get(f"/videos/{SAMPLE_VIDEO}")
+    if kind == "register_token":
+        return await client.post("/register-token", json={"token": f"ExponentPushToken[{random.getrandbits(40):x}]"})
+    if kind == "chat":
+        return await client.post("/chat", json={"message": "Is machine 1 running?"})
+    if kind == "send_notification":
+        return await client.post("/send-notification", json={"title": "Load test", "body": "Hello"})
+    if kind == "internal_update_status":
+        return await client.post("/internal-update-status", json={"functioning": random.random() < 0.5})
+    raise ValueError(kind)
+
+
+async def virtual_user(client, mix, deadline, think_time, results):
+    kinds, weights = list(mix), list(mix.values())
+    while time.perf_counter() < deadline:
+        kind = random.choices(kinds, weights)[0]
+        start = time.perf_counter()
+        try:
+            response = await request(client, kind)
+            # /chat reports upstream failures in the body with a 200
+            ok = response.status_code < 400 and not (kind == "chat" and "error" in response.json())
+        except Exception:
+            ok = False
+        results.append((kind, time.perf_counter() - start, ok))
+        if think_time:
+            await asyncio.sleep(random.expovariate(1 / think_time))
+
+
+async def drive(base_url, users, duration, mix, think_time):
+    import httpx
+
+    results = []
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+        deadline = time.perf_counter() + duration
+        await asyncio.gather(*(virtual_user(client, mix, deadline, think_time, results) for _ in range(users)))
+    return results
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return None
+    index = min(len(values) - 1, max(0, round(q / 100 * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(results, duration, lag):
+    report = {
+        "requests": len(results),
+        "throughput_rps": round(len(results) / duration, 1),
+        "errors": sum(1 for _, _, ok in results if not ok),
+        "event_loop": {
+            "blocked_s": round(lag["blocked_s"], 3),
+            "blocked_fraction": round(lag["blocked_s"] / duration, 3),
+            "max_lag_ms": round(lag["max_s"] * 1000, 1),
+        },
+        "endpoints": {},
+    }
+    for kind in sorted({kind for kind, _, _ in results}):
+        latencies = [latency * 1000 for k, latency, _ in results if k == kind]
+        report["endpoints"][kind] = {
+            "requests": len(latencies),
+            "errors": sum(1 for k, _, ok in results if k == kind and not ok),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p90_ms": round(percentile(latencies, 90), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(max(latencies), 1),
+        }
+    return report
+
+
+def run(args):
+    push_url, push_server = start_stub(ExpoPushStub, args.push_latency, args.push_error_rate)
+    llm_url, llm_server = start_stub(AzureOpenAIStub, args.llm_latency, args.llm_error_rate,
+                                     function_call_rate=args.function_call_rate)
+
+    # the backend serves recordings/ relative to its working directory
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    os.makedirs(os.path.join(workdir, "recordings"))
+    with open(os.path.join(workdir, "recordings", SAMPLE_VIDEO), "wb") as f:
+        f.write(os.urandom(args.video_kb * 1024))
+
+    repo = os.path.dirname(os.path.abspath(__file__))
+    env = dict(os.environ,
+               PYTHONPATH=repo + os.pathsep + os.environ.get("PYTHONPATH", ""),
+               EXPO_PUSH_URL=f"{push_url}/--/api/v2/push/send",
+               AZURE_ENDPOINT=llm_url,
+               AZURE_API_KEY="stub",
+               AZURE_API_VERSION="2024-02-01",
+               AZURE_DEPLOYMENT_NAME="stub",
+               PRELOAD_VISION="1")
+    server = subprocess.Popen([sys.executable, os.path.join(repo, "load_test.py"), "serve", "--port", str(args.port)],
+                              cwd=workdir, env=env)
+    base_url = f"http://127.0.0.1:{args.port}"
+    try:
+        wait_until_up(f"{base_url}/status")
+        try:
+            with urllib.request.urlopen(f"{base_url}/videos/{SAMPLE_VIDEO}", timeout=10) as response:
+                response.read()
+        except OSError as e:
+            # every "video" request would fail and only measure the error path
+            raise RuntimeError(f"Sample clip {SAMPLE_VIDEO} is not served by the backend: {e}") from e
+        print(f"🚀 Backend up, {args.users} users for {args.duration}s")
+
+        start = time.perf_counter()
+        results = asyncio.run(drive(base_url, args.users, args.duration, args.mix, args.think_time))
+        elapsed = time.perf_counter() - start
+
+        with urllib.request.urlopen(f"{base_url}/__loadtest/lag") as response:
+            lag = json.load(response)
+    finally:
+        server.terminate()
+        server.wait()
+        push_server.shutdown()
+        llm_server.shutdown()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    report = summarize(results, elapsed, lag)
+    report["config"] = {key: value for key, value in vars(args).items() if key != "command"}
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test the FastAPI backend against local stubs")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "serve"])
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--users", type=int, default=20, help="concurrent virtual phones")
+    parser.add_argument("--duration", type=float, default=20, help="seconds of load")
+    parser.add_argument("--think-time", type=float, default=0.0, help="mean pause between a user's requests (s)")
+    parser.add_argument("--mix", type=json.loads, default=DEFAULT_MIX,
+                        help=f"request weights as JSON, default {json.dumps(DEFAULT_MIX)}")
+    parser.add_argument("--push-latency", type=float, default=0.2)
+    parser.add_argument("--push-error-rate", type=float, default=0.0)
+    parser.add_argument("--llm-latency", type=float, default=0.5)
+    parser.add_argument("--llm-error-rate", type=float, default=0.0)
+    parser.add_argument("--function-call-rate", type=float, default=0.2,
+                        help="share of stub LLM answers that call a function (two LLM round trips)")
+    parser.add_argument("--video-kb", type=int, default=512, help="size of the sample clip served by /videos")
+    parser.add_argument("--out", default="Results/load_test.json")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        serve(args.port)
+    else:
+        report = run(args)
+        os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
+        with open(args.out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(json.dumps(report, indent=2))
@@ -31,14 +31,22 @@ def main():
         
         line = False  # True for horizontal line, False for vertical line
         factor = 0.35  # Line position factor (35% of width/height)
-        cross_threshold = 4  # Time threshold for stopped detection
+        cross_threshold = 30  # Seconds without a crossing before the line counts as stopped, > time_th / (obj_per_time - bounds)
         targets = [2]  # Target classes: Box, Fruit, bag, bottle, jar, mask, pallet
         obj_per_time = 3  # Expected objects per time period
-        time_th = 30  # Time threshold for production check (seconds)
+        time_th = 30  # Time period (seconds) obj_per_time refers to
         bounds = 1  # Margin of error for object count
+        track_log = "logs/tracks.bin"  # Track log for replaying other line settings without YOLO
+
+        # Extra lines / polygon zones (virtual_line.LineZone / PolygonZone) counted from the same tracks,
+        # e.g. a second conveyor. Drawn right to left, so like the main line it counts objects moving down:
+        # LineZone("conveyor_2", start=(640, 400), end=(0, 400), targets=[0], obj_per_time=5, time_th=30, bounds=1, cross_threshold=10)
+        # PolygonZone("merge", points=[(300, 100), (500, 100), (500, 300), (300, 300)], targets=[0, 2])
+        zones = []
         
         # Run analysis
-        OperationStatus(test_video, out_path, line, factor, cross_threshold, targets, obj_per_time, time_th, bounds)
+        OperationStatus(test_video, out_path, line, factor, cross_threshold, targets, obj_per_time, time_th, bounds, track_log,
+                        zones=zones)
         
             
     else:
@@ -0,0 +1,132 @@
+"""
+Registry of the YOLO weights shipped in Our_Models.
+
+Models are loaded lazily by name and kept in a small LRU pool, so every line
+using the same weights shares one loaded model instead of loading its own copy.
+Weights can be swapped while the capture loops keep running: the new model is
+loaded next to the old one and replaces it once it is ready.
+"""
+
+import copy
+import os
+import threading
+from collections import OrderedDict
+
+MODEL_PATHS = {
+    "bestdet": "Our_Models/Best_Models/bestdet.pt",
+    "model2": "Our_Models/Model2/model2.pt",
+    "model1.1": "Our_Models/Model1_collab/model1.1.pt",
+    "model1_local": "Our_Models/Model1_local/Model1_local.pt",
+    "yolov8n": "Our_Models/Pre-trained_Models/yolov8n.pt",
+    "yolov8s": "Our_Models/Pre-trained_Models/yolov8s.pt",
+    "yolov8m": "Our_Models/Pre-trained_Models/yolov8m.pt",
+    "yolov8l": "Our_Models/Pre-trained_Models/yolov8l.pt",
+}
+
+DEFAULT_MODEL = "bestdet"
+
+
+def load_yolo(path):
+    from ultralytics import YOLO
+    return YOLO(path)
+
+
+class ModelRegistry:
+    def __init__(self, paths=None, max_loaded=2, loader=load_yolo):
+        # paths: name -> weights file, defaults to the bundled models
+        # max_loaded: how many models are kept in memory at the same time
+        # loader: function turning a weights path into a model
+        self.paths = dict(MODEL_PATHS if paths is None else paths)
+        self.max_loaded = max_loaded
+        self.loader = loader
+        self.loaded = OrderedDict()  # name -> model, least recently used first
+        self.versions = {}
+        self.lock = threading.Lock()
+        self.load_locks = {}
+
+    def register(self, name, path):
+        with self.lock:
+            self.paths[name] = path
+
+    def names(self):
+        return list(self.paths)
+
+    def resolve(self, name):
+        """Accept a registered name or a path to a weights file."""
+        if name not in self.paths and os.path.exists(name):
+            self.register(name, name)
+        if name not in self.paths:
+            raise KeyError(f"Unknown model: {name}")
+        return name
+
+    def version(self, name):
+        """Bumped every time the weights behind `name` are swapped."""
+        with self.lock:
+            return self.versions.get(name, 0)
+
+    def get(self, name=DEFAULT_MODEL):
+        """The shared model for `name`, loading it on first use."""
+        name = self.resolve(name)
+        with self.lock:
+            if name in self.loaded:
+                self.loaded.move_to_end(name)
+                return self.loaded[name]
+            load_lock = self.load_locks.setdefault(name, threading.Lock())
+
+        # load outside the registry lock so other models stay available
+        with load_lock:
+            with self.lock:
+                if name in self.loaded:
+                    self.loaded.move_to_end(name)
+                    return self.loaded[name]
+                path = self.paths[name]
+            model = self.loader(path)
+            return self._store(name, model, path)
+
+    def tracker(self, name=DEFAULT_MODEL):
+        """
+        A per-line handle for model.track(): shares the loaded weights but has
+        its own predictor, so each line keeps its own tracker state and ids.
+        """
+        model = self.get(name)
+        handle = copy.copy(model)
+        handle.predictor = None
+        handle.callbacks = {event: list(funcs) for event, funcs in model.callbacks.items()}
+        return handle
+
+    def swap(self, name, path, background=True):
+        """
+        Point `name` at new weights. The old model keeps serving until the new
+        one is loaded; running lines pick it up through version().
+        """
+        def load():
+            model = self.loader(path)
+            with self.lock:
+                self.paths[name] = path
+            self._store(name, model, path, swapped=True)
+            print(f"🔁 Model {name} swapped to {path}")
+
+        if background:
+            threading.Thread(target=load, daemon=True).start()
+        else:
+            load()
+
+    def _store(self, name, model, path, swapped=False):
+        """Keep `model` as the one loaded for `name`; returns the model now in use."""
+        with self.lock:
+            if self.paths[name] != path:
+                # swapped while this load was running: keep the new weights
+                if name in self.loaded:
+                    return self.loaded[name]
+                return model
+            self.loaded[name] = model
+            self.loaded.move_to_end(name)
+            if swapped:
+                self.versions[name] = self.versions.get(name, 0) + 1
+            # lines still holding an evicted model keep it alive until they let go
+            while len(self.loaded) > self.max_loaded:
+                self.loaded.popitem(last=False)
+            return model
+
+
+registry = ModelRegistry()
@@ -0,0 +1,242 @@
+"""
+Index and retention for the clips CameraMotionDetector writes to recordings/.
+
+The index is a small SQLite database next to the clips (camera, start / end
+time, duration, size, thumbnail), so listing and lookups never scan the
+directory. sync() brings it up to date incrementally: only files that are new
+or changed since the last run are probed. RetentionManager deletes old clips in
+the background to stay under a disk quota and a maximum age, but keeps clips
+recorded around stoppage events.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+INDEX_FILE = "index.sqlite3"
+THUMBNAIL_DIR = "thumbnails"
+THUMBNAIL_WIDTH = 160
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS clips (
+    filename TEXT PRIMARY KEY,
+    camera TEXT,
+    start_time REAL,
+    end_time REAL,
+    duration REAL,
+    size INTEGER,
+    mtime REAL,
+    thumbnail TEXT
+);
+CREATE INDEX IF NOT EXISTS clips_start ON clips (start_time);
+CREATE TABLE IF NOT EXISTS events (
+    time REAL,
+    kind TEXT
+);
+CREATE INDEX IF NOT EXISTS events_time ON events (time);
+"""
+
+COLUMNS = ["filename", "camera", "start_time", "end_time", "duration", "size", "thumbnail"]
+
+
+def start_time_from_name(filename):
+    """motion_YYYYmmdd_HHMMSS.mp4 -> epoch seconds, or None."""
+    stem = os.path.splitext(filename)[0]
+    try:
+        return time.mktime(time.strptime(stem[-15:], "%Y%m%d_%H%M%S"))
+    except ValueError:
+        return None
+
+
+class RecordingIndex:
+    def __init__(self, record_path="recordings"):
+        self.record_path = record_path
+        self.thumbnail_path = os.path.join(record_path, THUMBNAIL_DIR)
+        os.makedirs(self.thumbnail_path, exist_ok=True)
+        self.lock = threading.Lock()
+        self.sync_lock = threading.Lock()  # one sync at a time, or both would probe and add the same clips
+        self.db = sqlite3.connect(os.path.join(record_path, INDEX_FILE), check_same_thread=False)
+        self.db.executescript(SCHEMA)
+
+    def _probe(self, filename):
+        """Duration and thumbnail of a clip (reads only its first frame)."""
+        import cv2  # Only needed for new clips, keeps importing the index cheap
+
+        path = os.path.join(self.record_path, filename)
+        cap = cv2.VideoCapture(path)
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        ret, frame = cap.read()
+        cap.release()
+
+        duration = frames / fps if fps > 0 else 0.0
+        thumbnail = None
+        if ret:
+            thumbnail = os.path.splitext(filename)[0] + ".jpg"
+            h, w = frame.shape[:2]
+            small = cv2.resize(frame, (THUMBNAIL_WIDTH, max(1, int(h * THUMBNAIL_WIDTH / w))))
+            cv2.imwrite(os.path.join(self.thumbnail_path, thumbnail), small)
+        return duration, thumbnail
+
+    def add(self, path, camera="unknown", start_time=None, end_time=None):
+        """Index a finished clip (called by the detector after releasing the writer)."""
+        filename = os.path.basename(path)
+        stat = os.stat(os.path.join(self.record_path, filename))
+        duration, thumbnail = self._probe(filename)
+        if start_time is None:
+            start_time = start_time_from_name(filename) or stat.st_mtime - duration
+        if end_time is None:
+            end_time = start_time + duration
+        with self.lock, self.db:
+            self.db.execute("INSERT OR REPLACE INTO clips VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                            (filename, camera, start_time, end_time, end_time - start_time,
+                             stat.st_size, stat.st_mtime, thumbnail))
+
+    def sync(self):
+        """Index new or changed clips and drop entries whose file is gone."""
+        with self.sync_lock:
+            self._sync()
+
+    def _sync(self):
+        on_disk = {}
+        with os.scandir(self.record_path) as entries:
+            for entry in entries:
+                if entry.is_file() and entry.name.endswith(".mp4"):
+                    stat = entry.stat()
+                    on_disk[entry.name] = (stat.st_size, stat.st_mtime)
+
+        with self.lock:
+            known = {row[0]: (row[1], row[2]) for row in
+                     self.db.execute("SELECT filename, size, mtime FROM clips")}
+
+        removed = [name for name in known if name not in on_disk]
+        changed = [name for name, info in on_disk.items() if known.get(name) != info]
+        for filename in changed:
+            self.add(filename)
+        self._forget(removed)
+        print(f"🗂️  Recording index: {len(changed)} added/updated, {len(removed)} removed, {len(on_disk)} clips")
+
+    def _forget(self, filenames):
+        with self.lock, self.db:
+            self.db.executemany("DELETE FROM clips WHERE filename = ?", [(name,) for name in filenames])
+
+    def get(self, filename):
+        with self.lock:
+            row = self.db.execute(f"SELECT {', '.join(COLUMNS)} FROM clips WHERE filename = ?",
+                                  (filename,)).fetchone()
+        return dict(zip(COLUMNS, row)) if row else None
+
+    def list(self, start=None, end=None, camera=None, page=1, page_size=50):
+        """Clips overlapping [start, end], newest first; returns (clips, total)."""
+        conditions, params = [], []
+        if start is not None:
+            conditions.append("end_time >= ?")
+            params.append(start)
+        if end is not None:
+            conditions.append("start_time <= ?")
+            params.append(end)
+        if camera is not None:
+            conditions.append("camera = ?")
+            params.append(camera)
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self.lock:
+            total = self.db.execute(f"SELECT COUNT(*) FROM clips {where}", params).fetchone()[0]
+            rows = self.db.execute(
+                f"SELECT {', '.join(COLUMNS)} FROM clips {where} ORDER BY start_time DESC LIMIT ? OFFSET ?",
+                params + [page_size, (page - 1) * page_size]).fetchall()
+        return [dict(zip(COLUMNS, row)) for row in rows], total
+
+    def started_after(self, since, after="", limit=500):
+        """
+        Clips starting after (since, after), oldest first; returns (clips, more).
+
+        Clips are ordered by (start_time, filename): pass the start_time and the
+        filename of the last clip back as `since` and `after` to get the rest,
+        so clips sharing a start_time are never skipped between pages.
+        """
+        with self.lock:
+            rows = self.db.execute(
+                f"""SELECT {', '.join(COLUMNS)} FROM clips
+                    WHERE start_time > ? OR (start_time = ? AND filename > ?)
+                    ORDER BY start_time, filename LIMIT ?""",
+                (since, since, after, limit + 1)).fetchall()
+        clips = [dict(zip(COLUMNS, row)) for row in rows]
+        return clips[:limit], len(clips) > limit
+
+    def add_event(self, kind="stoppage", timestamp=None):
+        """Remember an event; clips recorded around it are kept by the retention policy."""
+        with self.lock, self.db:
+            self.db.execute("INSERT INTO events VALUES (?, ?)", (timestamp or time.time(), kind))
+
+    def delete(self, filename):
+        clip = self.get(filename)
+        paths = [os.path.join(self.record_path, filename)]
+        if clip and clip["thumbnail"]:
+            paths.append(os.path.join(self.thumbnail_path, clip["thumbnail"]))
+        for path in paths:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+        self._forget([filename])
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+class RetentionManager(threading.Thread):
+    """
+    Periodically deletes clips older than max_age_days, then the oldest clips
+    until the recordings use at most max_bytes. Clips within keep_margin
+    seconds of a stoppage event are never deleted.
+    """
+
+    def __init__(self, index, max_bytes=5 * 2**30, max_age_days=7, keep_margin=300, interval=600):
+        super().__init__(daemon=True)
+        self.index = index
+        self.max_bytes = max_bytes
+        self.max_age_days = max_age_days
+        self.keep_margin = keep_margin
+        self.interval = interval
+        self.stopped = threading.Event()
+
+    def candidates(self):
+        """Deletable clips, oldest first, with their sizes."""
+        with self.index.lock:
+            return self.index.db.execute(
+                """SELECT filename, start_time, size FROM clips c
+                   WHERE NOT EXISTS (SELECT 1 FROM events e
+                                     WHERE e.time BETWEEN c.start_time - ? AND c.end_time + ?)
+                   ORDER BY start_time""", (self.keep_margin, self.keep_margin)).fetchall()
+
+    def run_once(self):
+        # Pick up clips written since the last run (e.g. by a detector without the index)
+        self.index.sync()
+        with self.index.lock:
+            used = self.index.db.execute("SELECT COALESCE(SUM(size), 0) FROM clips").fetchone()[0]
+        cutoff = time.time() - self.max_age_days * 86400
+
+        deleted = 0
+        for filename, start_time, size in self.candidates():
+            if start_time >= cutoff and used <= self.max_bytes:
+                break
+            self.index.delete(filename)
+            used -= size
+            deleted += 1
+        if deleted:
+            print(f"🧹 Retention: deleted {deleted} clips, {used / 2**20:.0f} MB in use")
+        return deleted
+
+    def run(self):
+        while not self.stopped.is_set():
+            try:
+                self.run_once()
+            except Exception as e:
+                print("❌ Retention run failed:", e)
+            self.stopped.wait(self.interval)
+
+    def stop(self):
+        self.stopped.set()
@@ -1,7 +1,11 @@
 import json
+import math
 import statistics
+from dataclasses import dataclass
 from datetime import datetime
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable
+
+import numpy as np
 
 class SimplifiedProductionData:
     """
@@ -21,46 +25,34 @@ class SimplifiedProductionData:
     @classmethod
     def from_yolo_output(cls, yolo_data: Dict[str, Any]) -> 'SimplifiedProductionData':
         """Convert verbose YOLO output to simplified format."""
+        aggregator = ProductionAggregator(frame_count=yolo_data.get('frame_count', 1),
+                                          fps=yolo_data.get('fps', 30))
+        aggregator.add_detections(yolo_data.get('detections', []))
+        return cls.from_aggregator(aggregator)
+    
+    @classmethod
+    def from_aggregator(cls, aggregator: 'ProductionAggregator') -> 'SimplifiedProductionData':
+        """Build the simplified format from streamed per-class statistics."""
         simplified = cls()
         
         # Basic info
         simplified.timestamp = datetime.now().isoformat()
-        
-        # Extract objects and count them
-        detections = yolo_data.get('detections', [])
-        simplified.total_objects = len(detections)
-        
-        # Group by object type
-        type_counts = {}
-        confidences_by_type = {}
-        
-        for detection in detections:
-            obj_type = detection.get('class', 'unknown')
-            confidence = detection.get('confidence', 0.0)
-            
-            # Count objects
-            type_counts[obj_type] = type_counts.get(obj_type, 0) + 1
-            
-            # Track confidence scores
-            if obj_type not in confidences_by_type:
-                confidences_by_type[obj_type] = []
-            confidences_by_type[obj_type].append(confidence)
-        
-        simplified.objects_by_type = type_counts
+        simplified.total_objects = aggregator.total_objects
+        simplified.objects_by_type = {obj_type: stats.count for obj_type, stats in aggregator.stats.items()}
         
         # Calculate quality metrics
-        for obj_type, confidences in confidences_by_type.items():
-            if confidences:
+        for obj_type, stats in aggregator.stats.items():
+            if stats.count:
                 simplified.quality_metrics[obj_type] = {
-                    'avg_confidence': round(statistics.mean(confidences), 2),
-                    'min_confidence': round(min(confidences), 2),
-                    'max_confidence': round(max(confidences), 2)
+                    'avg_confidence': round(stats.mean, 2),
+                    'min_confidence': round(stats.min, 2),
+                    'max_confidence': round(stats.max, 2)
                 }
         
         # Calculate production rate (objects per minute - simplified)
-        frame_count = yolo_data.get('frame_count', 1)
-        fps = yolo_data.get('fps', 30)
-        time_seconds = frame_count / fps if fps > 0 else 1
+        frame_count = aggregator.frame_count
+        fps = aggregator.fps
+        time_seconds = frame_count / fps if fps > 0 and frame_count > 0 else 1
         simplified.production_rate = round((simplified.total_objects / time_seconds) * 60, 1)
         
         # Generate alerts for low confidence or missing objects
@@ -114,6 +106,146 @@ class SimplifiedProductionData:
         
         return summary
 
+
+@dataclass
+class ClassStats:
+    """
+    Running confidence statistics for one object type.
+    
+    The sum uses Neumaier's compensated summation, so mean rounds like
+    statistics.mean over all the confidences; the variance uses Welford's
+    algorithm.
+    """
+    count: int = 0
+    total: float = 0.0
+    compensation: float = 0.0  # low-order bits lost from total
+    m2: float = 0.0
+    min: float = math.inf
+    max: float = -math.inf
+    
+    @property
+    def mean(self) -> float:
+        return (self.total + self.compensation) / self.count if self.count else 0.0
+    
+    @property
+    def variance(self) -> float:
+        return self.m2 / self.count if self.count else 0.0
+    
+    def _add_to_total(self, value: float):
+        total = self.total + value
+        if abs(self.total) >= abs(value):
+            self.compensation += (self.total - total) + value
+        else:
+            self.compensation += (value - total) + self.total
+        self.total = total
+    
+    def add(self, confidence: float):
+        confidence = float(confidence)
+        previous_mean = self.mean
+        self.count += 1
+        self._add_to_total(confidence)
+        self.m2 += (confidence - previous_mean) * (confidence - self.mean)
+        if confidence < self.min:
+            self.min = confidence
+        if confidence > self.max:
+            self.max = confidence
+    
+    def merge(self, other: 'ClassStats'):
+        """Combine with statistics computed elsewhere (Chan et al. parallel update)."""
+        if other.count == 0:
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self._add_to_total(other.total)
+        self.compensation += other.compensation
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+
+class ProductionAggregator:
+    """
+    Streaming replacement for the detections list of from_yolo_output.
+    
+    Keeps count, mean, min, max and variance of the confidence per object type,
+    so memory stays constant however many detections are fed in. Aggregators
+    from several workers or cameras can be merged.
+    """
+    
+    def __init__(self, frame_count: int = 0, fps: float = 30, class_names: Dict[int, str] = None):
+        self.frame_count = frame_count
+        self.fps = fps
+        self.class_names = class_names or {}
+        self.stats: Dict[str, ClassStats] = {}
+    
+    @property
+    def total_objects(self) -> int:
+        return sum(stats.count for stats in self.stats.values())
+    
+    def _stats_for(self, obj_type: str) -> ClassStats:
+        if obj_type not in self.stats:
+            self.stats[obj_type] = ClassStats()
+        return self.stats[obj_type]
+    
+    def add(self, detection: Dict[str, Any]):
+        """Add one detection dict ({'class': ..., 'confidence': ...})."""
+        obj_type = detection.get('class', 'unknown')
+        self._stats_for(obj_type).add(detection.get('confidence', 0.0))
+    
+    def add_detections(self, detections: Iterable[Dict[str, Any]]):
+        for detection in detections:
+            self.add(detection)
+    
+    def _name(self, class_id) -> Any:
+        """Class name for an integer class id, or the id itself without a name."""
+        return self.class_names.get(class_id, class_id)
+    
+    def add_frame(self, classes: np.ndarray, confidences: np.ndarray):
+        """
+        Add the detections of one frame as arrays, e.g. boxes.cls and boxes.conf
+        of a YOLO result. Class ids (floats in YOLO results) are stored as ints,
+        mapped through class_names when given.
+        """
+        self.frame_count += 1
+        classes = np.asarray(classes).astype(np.int64).reshape(-1)
+        confidences = np.asarray(confidences, dtype=np.float64).reshape(-1)
+        if classes.size == 0:
+            return
+        
+        # per class id statistics, indexed by the id itself
+        counts = np.bincount(classes)
+        sums = np.bincount(classes, weights=confidences)
+        means = sums / np.maximum(counts, 1)
+        m2s = np.bincount(classes, weights=(confidences - means[classes]) ** 2)
+        mins = np.full(len(counts), np.inf)
+        maxs = np.full(len(counts), -np.inf)
+        first = np.full(len(counts), len(classes))
+        np.minimum.at(mins, classes, confidences)
+        np.maximum.at(maxs, classes, confidences)
+        np.minimum.at(first, classes, np.arange(len(classes)))
+        
+        # keep the order in which object types first show up, like add() does
+        present = np.flatnonzero(counts)
+        for i in present[np.argsort(first[present])].tolist():
+            obj_type = self._name(i)
+            frame_stats = ClassStats(int(counts[i]), float(sums[i]), 0.0, float(m2s[i]), float(mins[i]), float(maxs[i]))
+            self._stats_for(obj_type).merge(frame_stats)
+    
+    def merge(self, other: 'ProductionAggregator') -> 'ProductionAggregator':
+        """Fold in a partial aggregate from another worker or camera."""
+        self.frame_count += other.frame_count
+        for obj_type, stats in other.stats.items():
+            # the other side may not have had class_names for its class ids
+            if isinstance(obj_type, int):
+                obj_type = self._name(obj_type)
+            self._stats_for(obj_type).merge(stats)
+        return self
+    
+    def to_production_data(self) -> SimplifiedProductionData:
+        return SimplifiedProductionData.from_aggregator(self)
+
+
 def simplify_for_chatgpt(complex_data: Dict[str, Any]) -> Dict[str, Any]:
     """
     Main function to convert complex YOLO/CV output to ChatGPT-friendly format.
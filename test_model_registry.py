@@ -0,0 +1,39 @@
+import threading
+import time
+
+from model_registry import ModelRegistry
+
+
+def slow_loader(delays):
+    def load(path):
+        time.sleep(delays.get(path, 0))
+        return f"model:{path}"
+    return load
+
+
+def test_get_shares_one_load():
+    loads = []
+    registry = ModelRegistry(paths={"m": "a.pt"}, loader=lambda path: loads.append(path) or object())
+    assert registry.get("m") is registry.get("m")
+    assert loads == ["a.pt"]
+
+
+def test_swap_wins_over_a_slower_get_of_the_old_weights():
+    registry = ModelRegistry(paths={"m": "old.pt"}, loader=slow_loader({"old.pt": 0.3, "new.pt": 0.05}))
+    getter = threading.Thread(target=registry.get, args=("m",))
+    getter.start()
+    time.sleep(0.05)  # get() is now loading old.pt
+    registry.swap("m", "new.pt", background=False)
+    getter.join()
+
+    assert registry.version("m") == 1
+    assert registry.get("m") == "model:new.pt"
+
+
+def test_lru_eviction():
+    registry = ModelRegistry(paths={"a": "a.pt", "b": "b.pt", "c": "c.pt"}, max_loaded=2, loader=str)
+    registry.get("a")
+    registry.get("b")
+    registry.get("a")
+    registry.get("c")
+    assert list(registry.loaded) == ["a", "c"]
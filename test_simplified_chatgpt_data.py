@@ -0,0 +1,81 @@
+import random
+import statistics
+
+import numpy as np
+
+from simplified_chatgpt_data import ClassStats, ProductionAggregator, simplify_for_chatgpt
+
+
+def list_based_quality_metrics(detections):
+    """What from_yolo_output computed before it streamed: lists per type and statistics.mean."""
+    confidences_by_type = {}
+    for detection in detections:
+        confidences_by_type.setdefault(detection.get('class', 'unknown'), []).append(detection.get('confidence', 0.0))
+    return {
+        obj_type: {
+            'avg_confidence': round(statistics.mean(confidences), 2),
+            'min_confidence': round(min(confidences), 2),
+            'max_confidence': round(max(confidences), 2),
+        }
+        for obj_type, confidences in confidences_by_type.items()
+    }
+
+
+def test_matches_list_based_output():
+    rng = random.Random(0)
+    for _ in range(2000):
+        detections = [{'class': rng.choice(['product', 'defect', 'box']), 'confidence': rng.random()}
+                      for _ in range(rng.randint(1, 60))]
+        result = simplify_for_chatgpt({'detections': detections, 'frame_count': 90, 'fps': 30})
+        expected = list_based_quality_metrics(detections)
+
+        assert result['quality_metrics'] == expected
+        assert list(result['objects_detected']) == list(expected)
+        assert result['summary']['total_objects'] == len(detections)
+
+
+def test_add_frame_matches_list_based_output():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        classes = rng.integers(0, 3, 40).astype(np.float32)
+        confidences = rng.random(40).astype(np.float32)
+        aggregator = ProductionAggregator()
+        for start in range(0, 40, 8):
+            aggregator.add_frame(classes[start:start + 8], confidences[start:start + 8])
+
+        detections = [{'class': int(c), 'confidence': float(x)} for c, x in zip(classes, confidences)]
+        expected = list_based_quality_metrics(detections)
+        assert aggregator.to_production_data().quality_metrics == expected
+        assert aggregator.frame_count == 5
+
+
+def test_merge_matches_one_aggregator():
+    rng = np.random.default_rng(1)
+    confidences = rng.random(1000)
+    whole, left, right = ClassStats(), ClassStats(), ClassStats()
+    for i, confidence in enumerate(confidences):
+        whole.add(confidence)
+        (left if i % 3 else right).add(confidence)
+    left.merge(right)
+
+    assert left.count == whole.count
+    assert abs(left.mean - statistics.mean(confidences.tolist())) < 1e-15
+    assert abs(left.variance - np.var(confidences)) < 1e-12
+    assert (left.min, left.max) == (whole.min, whole.max)
+
+
+def test_class_ids_are_ints_and_names_merge():
+    named = ProductionAggregator(class_names={0: 'Box'})
+    unnamed = ProductionAggregator()
+    named.add_frame(np.array([0.0, 0.0]), np.array([0.5, 0.7]))
+    unnamed.add_frame(np.array([0.0, 2.0]), np.array([0.9, 0.4]))
+
+    assert list(unnamed.stats) == [0, 2]
+    named.merge(unnamed)
+    assert {obj_type: stats.count for obj_type, stats in named.stats.items()} == {'Box': 3, 2: 1}
+
+
+def test_accepts_numpy_float32():
+    aggregator = ProductionAggregator()
+    aggregator.add({'class': 'box', 'confidence': np.float32(0.75)})
+    assert aggregator.stats['box'].mean == 0.75
@@ -0,0 +1,58 @@
+import pytest
+
+from throughput import RUNNING, STOPPED, TOO_FAST, TOO_SLOW, ThroughputMonitor
+
+
+def run(monitor, crossings, end, step=1.0):
+    """Feed crossings at the given times and update every `step` seconds; returns [(time, state)]."""
+    events = []
+    crossings = sorted(crossings)
+    i = 0
+    now = 0.0
+    while now <= end:
+        while i < len(crossings) and crossings[i] <= now:
+            monitor.crossing(crossings[i])
+            i += 1
+        new_state = monitor.update(now)
+        if new_state is not None:
+            events.append((now, new_state))
+        now += step
+    return events
+
+
+def test_cross_threshold_must_exceed_slowest_allowed_gap():
+    # 3 objects per 30 s with bounds 1: the slowest allowed gap is 30 / 2 = 15 s
+    with pytest.raises(ValueError, match="cross_threshold"):
+        ThroughputMonitor(3, 30, 1, 15)
+    ThroughputMonitor(3, 30, 1, 30)
+
+
+def test_bounds_covering_obj_per_time_accept_any_threshold():
+    ThroughputMonitor(1, 30, 1, 5)
+
+
+def test_normal_rate_stays_running():
+    monitor = ThroughputMonitor(3, 30, 1, 30)
+    assert run(monitor, range(0, 300, 10), 300) == []
+    assert monitor.functioning
+
+
+def test_slow_line_is_too_slow_not_stopped():
+    # one object every 16 s is 1.9 per 30 s, below 3 - 1
+    monitor = ThroughputMonitor(3, 30, 1, 30)
+    events = run(monitor, range(0, 320, 16), 300)
+    assert [state for _, state in events] == [TOO_SLOW]
+
+
+def test_fast_line_is_too_fast():
+    monitor = ThroughputMonitor(3, 30, 1, 30)
+    events = run(monitor, range(0, 300, 5), 300)
+    assert [state for _, state in events] == [TOO_FAST]
+
+
+def test_stoppage_is_reported_after_cross_threshold_and_recovers():
+    monitor = ThroughputMonitor(3, 30, 1, 30)
+    crossings = list(range(0, 100, 10)) + list(range(200, 400, 10))
+    events = run(monitor, crossings, 400)
+    assert events[0] == (121.0, STOPPED)
+    assert [state for _, state in events] == [STOPPED, RUNNING]
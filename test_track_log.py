@@ -0,0 +1,103 @@
+import json
+
+import numpy as np
+
+from track_log import TRACK_DTYPE, TrackLog, TrackLogWriter, crossing_times, replay
+from virtual_line import LineCounter
+
+
+def synthetic_frames(frames=120, width=640, height=480):
+    """Objects moving at different speeds and directions, some of another class."""
+    rng = np.random.default_rng(0)
+    tracks = [
+        # id, class, start frame, start x, start y, speed x, speed y (px/frame)
+        (1, 2, 0, 10, 100, 8, 0),
+        (2, 2, 10, 40, 200, 5, 1),
+        (3, 0, 5, 0, 300, 9, 0),
+        (4, 2, 30, 300, 150, -4, 0),  # moving left, never counted by a vertical line
+        (5, 2, 60, 100, 400, 12, 0),
+        (6, 2, 0, 500, 20, 0, 6),  # moving down
+    ]
+    for frame in range(frames):
+        ids, classes, confs, boxes = [], [], [], []
+        for obj_id, cls, start, x0, y0, vx, vy in tracks:
+            if frame < start:
+                continue
+            x = x0 + vx * (frame - start)
+            y = y0 + vy * (frame - start)
+            if not (0 <= x <= width and 0 <= y <= height):
+                continue
+            ids.append(obj_id)
+            classes.append(cls)
+            confs.append(rng.uniform(0.5, 1))
+            boxes.append([x - 15, y - 15, x + 15, y + 15])
+        yield frame + 1, frame / 30, ids, classes, confs, boxes
+
+
+def write_log(path, frames=120):
+    writer = TrackLogWriter(str(path), 640, 480, 30, "synthetic.mp4")
+    for frame, timestamp, ids, classes, confs, boxes in synthetic_frames(frames):
+        writer.write_frame(frame, timestamp, ids, classes, confs, boxes)
+    return writer
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / "tracks.bin"
+    write_log(path).close()
+
+    log = TrackLog(str(path))
+    expected = list(synthetic_frames())
+    assert len(log) == len(expected)
+    assert log.meta["frames"] == len(expected)
+    assert (log.width, log.height, log.fps) == (640, 480, 30)
+    for i, (frame, timestamp, ids, classes, confs, boxes) in enumerate(expected):
+        records = log.frame(i)
+        assert log.frame_numbers[i] == frame
+        assert log.frame_times[i] == timestamp
+        assert records["id"].tolist() == ids
+        assert records["cls"].tolist() == classes
+        np.testing.assert_allclose(records["conf"], confs, rtol=1e-6)
+        np.testing.assert_allclose(records["box"].reshape(-1, 4), np.reshape(boxes, (-1, 4)))
+
+
+def test_unclosed_log_with_partial_record_is_readable(tmp_path):
+    path = tmp_path / "tracks.bin"
+    writer = write_log(path, frames=50)
+    writer.file.flush()
+    with open(path, "ab") as f:
+        f.write(b"\0" * (TRACK_DTYPE.itemsize // 2))  # killed mid-write
+
+    # metadata was written when the log was opened
+    with open(str(path) + ".json") as f:
+        assert json.load(f)["width"] == 640
+    log = TrackLog(str(path))
+    assert len(log) == 50
+    writer.file.close()
+
+
+def test_empty_log(tmp_path):
+    path = tmp_path / "tracks.bin"
+    TrackLogWriter(str(path), 640, 480, 30).close()
+    log = TrackLog(str(path))
+    assert len(log) == 0
+    assert len(crossing_times(log, False, 0.5, [2])) == 0
+
+
+def test_replay_matches_line_counter(tmp_path):
+    path = tmp_path / "tracks.bin"
+    write_log(path).close()
+    log = TrackLog(str(path))
+
+    for line, factor, targets in [(False, 0.35, [2]), (False, 0.8, [0, 2]), (True, 0.5, [2])]:
+        counter = LineCounter(line, factor, 640, 480, targets)
+        live_times = []
+        for frame, timestamp, ids, classes, confs, boxes in synthetic_frames():
+            before = counter.count
+            counter.update(boxes, ids, classes)
+            live_times += [timestamp] * (counter.count - before)
+
+        replayed = crossing_times(log, line, factor, targets)
+        assert counter.count > 0
+        assert len(replayed) == counter.count
+        np.testing.assert_allclose(replayed, live_times)
+        assert replay(log, line, factor, 30, targets, 3, 30, 1)["count"] == counter.count
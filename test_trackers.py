@@ -0,0 +1,55 @@
+import numpy as np
+
+from trackers import ConveyorTracker, iou_matrix
+from virtual_line import LineCounter
+
+
+def moving_boxes(frames, starts, speed, size=30, axis=0, across=100):
+    """Per frame: boxes of objects starting at `starts` and moving `speed` px per frame along the axis."""
+    starts = np.asarray(starts, dtype=float)
+    for frame in range(frames):
+        along = starts + speed * frame
+        along = along[(along >= 0) & (along <= 640)]
+        centers = np.column_stack([along, np.full(len(along), across)])
+        if axis == 1:
+            centers = centers[:, ::-1]
+        yield np.hstack([centers - size / 2, centers + size / 2])
+
+
+def track_and_count(tracker, frames, line):
+    counter = LineCounter(line, 0.5, 640, 640, [2])
+    ids = set()
+    for boxes in frames:
+        classes = np.full(len(boxes), 2)
+        boxes, out_ids, classes, _ = tracker.update(boxes, classes, np.full(len(boxes), 0.9))
+        counter.update(boxes, out_ids, classes)
+        ids.update(out_ids.tolist())
+    return counter.count, len(ids)
+
+
+def test_iou_matrix():
+    a = np.array([[0, 0, 10, 10]], dtype=float)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=float)
+    np.testing.assert_allclose(iou_matrix(a, b), [[1, 1 / 3, 0]])
+
+
+def test_slow_objects_keep_their_ids():
+    starts = np.arange(0, -1500, -150)
+    assert track_and_count(ConveyorTracker(axis=0), moving_boxes(250, starts, speed=8), line=False) == (10, 10)
+
+
+def test_fast_small_object_links_across_frames():
+    # 30 px boxes moving 35 px per frame never overlap from one frame to the next
+    assert track_and_count(ConveyorTracker(axis=0), moving_boxes(19, [0], speed=35), line=False) == (1, 1)
+
+
+def test_fast_objects_in_a_row_are_counted_once_each():
+    starts = np.arange(0, -1320, -120)
+    assert track_and_count(ConveyorTracker(axis=0), moving_boxes(60, starts, speed=35), line=False) == (11, 11)
+
+
+def test_dropped_frames_along_y():
+    # every other frame lost by the capture thread: objects jump 60 px between frames
+    starts = np.arange(0, -1000, -200)
+    frames = list(moving_boxes(80, starts, speed=30, axis=1))[::2]
+    assert track_and_count(ConveyorTracker(axis=1), frames, line=True) == (5, 5)
@@ -0,0 +1,46 @@
+import pytest
+
+from throughput import RUNNING, STOPPED
+from virtual_line import LineCounter, LineZone, ZoneCounter
+
+
+def box_at(x, y, size=20):
+    return [x - size / 2, y - size / 2, x + size / 2, y + size / 2]
+
+
+def test_zone_with_only_obj_per_time_uses_defaults():
+    zone = LineZone("b", (0, 100), (200, 100), [0], obj_per_time=5)
+    counter = ZoneCounter([zone], defaults={"time_th": 30, "bounds": 1, "cross_threshold": 10})
+
+    assert counter.update_status(0.0) == []
+    assert counter.update_status(11.0) == [("b", STOPPED)]
+
+
+def test_zone_settings_override_defaults():
+    zone = LineZone("b", (0, 100), (200, 100), [0], obj_per_time=5, cross_threshold=60)
+    counter = ZoneCounter([zone], defaults={"time_th": 30, "bounds": 1, "cross_threshold": 10})
+
+    counter.update_status(0.0)
+    assert counter.update_status(11.0) == []
+    assert counter.monitors["b"].state == RUNNING
+
+
+def test_zone_without_settings_or_defaults_is_rejected():
+    with pytest.raises(ValueError, match="time_th"):
+        ZoneCounter([LineZone("b", (0, 100), (200, 100), [0], obj_per_time=5)])
+
+
+def test_right_to_left_segment_counts_like_line_counter():
+    # same horizontal line at y = 100: the main line and a segment drawn right to left
+    line = LineCounter(True, 0.5, 200, 200, [0])
+    zones = ZoneCounter([LineZone("b", (200, 100), (0, 100), [0])])
+
+    for y in (80, 120):  # moving down
+        line.update([box_at(50, y)], [1], [0])
+        zones.update([box_at(50, y)], [1], [0], now=0.0)
+    for y in (120, 80):  # moving up, counted by neither
+        line.update([box_at(150, y)], [2], [0])
+        zones.update([box_at(150, y)], [2], [0], now=0.0)
+
+    assert line.count == 1
+    assert zones.counts["b"] == 1
@@ -0,0 +1,135 @@
+import math
+
+RUNNING = "Running"
+TOO_FAST = "Too Fast"
+TOO_SLOW = "Too Slow"
+STOPPED = "Stopped"
+
+
+def min_cross_threshold(obj_per_time, time_th, bounds):
+    """
+    Gap between two objects at the slowest rate that still counts as Too Slow
+    rather than Stopped; cross_threshold has to be longer than this.
+    """
+    if obj_per_time - bounds <= 0:
+        return 0.0
+    return time_th / (obj_per_time - bounds)
+
+
+class ThroughputMonitor:
+    """
+    Streaming production-rate estimator for one virtual line.
+
+    Keeps an EWMA of the time between crossings (O(1) per crossing) instead of
+    counting objects in fixed time_th windows, so the status no longer flaps at
+    window edges and a stoppage is reported cross_threshold seconds after the
+    last crossing instead of at the end of the window.
+    """
+
+    def __init__(self, obj_per_time, time_th, bounds, cross_threshold,
+                 alpha=0.3, hysteresis=0.5, min_dwell=None):
+        # obj_per_time, time_th, bounds: same meaning as in OperationStatus
+        # cross_threshold: seconds without a crossing before the line is stopped
+        # alpha: EWMA smoothing factor for the time between crossings
+        # hysteresis: fraction of bounds the rate has to move back inside the
+        #             band before we call the line Running again
+        # min_dwell: seconds a new (non stopped) state has to hold before it is reported
+        # a gap longer than cross_threshold restarts the estimate, so the
+        # rate can never drop below time_th / cross_threshold
+        slowest_gap = min_cross_threshold(obj_per_time, time_th, bounds)
+        if cross_threshold <= slowest_gap:
+            raise ValueError(f"cross_threshold ({cross_threshold}s) must be longer than the gap at the lowest "
+                             f"allowed rate, time_th / (obj_per_time - bounds) = {slowest_gap:g}s, "
+                             f"otherwise a slow line is reported as Stopped instead of Too Slow")
+        self.obj_per_time = obj_per_time
+        self.time_th = time_th
+        self.bounds = bounds
+        self.cross_threshold = cross_threshold
+        self.alpha = alpha
+        self.hysteresis = hysteresis
+        self.min_dwell = cross_threshold if min_dwell is None else min_dwell
+
+        self.state = RUNNING
+        self.avg_interval = None
+        self.last_cross_time = None
+        self.start_time = None
+        self.candidate = None
+        self.candidate_since = None
+
+    def crossing(self, now):
+        """Register one object crossing the line at time `now` (seconds)."""
+        if self.last_cross_time is None or now - self.last_cross_time > self.cross_threshold:
+            # first crossing or the line is restarting: the gap is a stoppage,
+            # not a production interval, so start the estimate from scratch
+            self.avg_interval = None
+        else:
+            interval = now - self.last_cross_time
+            if self.avg_interval is None:
+                self.avg_interval = interval
+            else:
+                self.avg_interval = self.alpha * interval + (1 - self.alpha) * self.avg_interval
+        self.last_cross_time = now
+
+    def rate(self, now):
+        """Estimated objects per time_th window, or None while warming up."""
+        if self.avg_interval is None:
+            return None
+        # a gap longer than the average already tells us the line slowed down
+        interval = max(self.avg_interval, now - self.last_cross_time)
+        if interval <= 0:
+            return math.inf
+        return self.time_th / interval
+
+    def _classify(self, now):
+        # before the first crossing the clock starts at the first update
+        last = self.last_cross_time if self.last_cross_time is not None else self.start_time
+        if now - last > self.cross_threshold:
+            return STOPPED
+
+        rate = self.rate(now)
+        if rate is None:
+            # one crossing since (re)start: moving, but not enough data for a rate
+            return self.state if self.state != STOPPED else RUNNING
+
+        low = self.obj_per_time - self.bounds
+        high = self.obj_per_time + self.bounds
+        if self.state == RUNNING:
+            margin = 0
+        else:
+            margin = self.hysteresis * self.bounds
+
+        if rate > high - margin and (self.state == TOO_FAST or rate > high):
+            return TOO_FAST
+        if rate < low + margin and (self.state == TOO_SLOW or rate < low):
+            return TOO_SLOW
+        return RUNNING
+
+    def update(self, now):
+        """
+        Re-evaluate the status at time `now`.
+
+        Returns the new state when it changes, otherwise None.
+        """
+        if self.start_time is None:
+            self.start_time = now
+        state = self._classify(now)
+
+        if state == self.state:
+            self.candidate = None
+            return None
+
+        if state != STOPPED and self.min_dwell > 0:
+            if state != self.candidate:
+                self.candidate = state
+                self.candidate_since = now
+                return None
+            if now - self.candidate_since < self.min_dwell:
+                return None
+
+        self.state = state
+        self.candidate = None
+        return state
+
+    @property
+    def functioning(self):
+        return self.state == RUNNING
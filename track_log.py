@@ -0,0 +1,214 @@
+"""
+Compact binary log of the tracks produced by OperationStatus.
+
+The log lets us recompute crossings and production statuses for any line
+configuration (orientation, factor, targets, thresholds) without running YOLO
+and the tracker over the video again.
+
+Layout: <name>.bin holds fixed-size little endian records (TRACK_DTYPE) and can
+be memory-mapped with numpy; <name>.bin.json holds the video metadata and is
+written as soon as the log is opened, so an interrupted run still leaves a
+readable log. Every frame starts with a marker record (id == -1) carrying the
+frame timestamp, followed by one record per tracked box.
+"""
+
+import argparse
+import json
+import os
+
+import numpy as np
+
+from throughput import ThroughputMonitor
+
+TRACK_DTYPE = np.dtype([
+    ("frame", "<u4"),
+    ("time", "<f8"),
+    ("id", "<i4"),
+    ("cls", "<i2"),
+    ("conf", "<f4"),
+    ("box", "<f4", (4,)),  # x1, y1, x2, y2 in pixels
+])
+
+FRAME_MARKER = -1
+
+
+class TrackLogWriter:
+    """Appends one frame of tracks at a time to a track log."""
+
+    def __init__(self, path, width, height, fps, video_path=None):
+        self.path = path
+        self.meta = {
+            "version": 1,
+            "video": video_path,
+            "width": width,
+            "height": height,
+            "fps": fps,
+            "frames": 0,
+        }
+        folder = os.path.dirname(path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        self.file = open(path, "wb")
+        self._write_meta()
+
+    def _write_meta(self):
+        with open(self.path + ".json", "w") as f:
+            json.dump(self.meta, f, indent=2)
+
+    def write_frame(self, frame, timestamp, ids=(), classes=(), confs=(), boxes=()):
+        records = np.zeros(len(ids) + 1, dtype=TRACK_DTYPE)
+        records["frame"] = frame
+        records["time"] = timestamp
+        records["id"][0] = FRAME_MARKER
+        records["cls"][0] = -1
+        if len(ids):
+            records["id"][1:] = ids
+            records["cls"][1:] = classes
+            records["conf"][1:] = confs
+            records["box"][1:] = boxes
+        self.file.write(records.tobytes())
+        self.meta["frames"] += 1
+
+    def close(self):
+        self.file.close()
+        self._write_meta()
+
+
+class TrackLog:
+    """
+    Read-only, memory-mapped view of a track log.
+
+    Only the per-frame marker positions are loaded into memory; the track
+    records stay on disk and are read through slices (see frame()).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path + ".json") as f:
+            self.meta = json.load(f)
+        # a run that was killed mid-write can leave a partial record at the end
+        length = os.path.getsize(path) // TRACK_DTYPE.itemsize
+        if length:
+            self.records = np.memmap(path, dtype=TRACK_DTYPE, mode="r", shape=(length,))
+        else:
+            self.records = np.zeros(0, dtype=TRACK_DTYPE)
+
+        self.markers = np.flatnonzero(self.records["id"] == FRAME_MARKER)
+        self.frame_times = np.asarray(self.records["time"][self.markers])
+        self.frame_numbers = np.asarray(self.records["frame"][self.markers])
+        self.frame_ends = np.append(self.markers[1:], len(self.records))
+
+    def __len__(self):
+        return len(self.markers)
+
+    def frame(self, i):
+        """Track records of the i-th logged frame, as a view into the log."""
+        return self.records[self.markers[i] + 1:self.frame_ends[i]]
+
+    @property
+    def width(self):
+        return self.meta["width"]
+
+    @property
+    def height(self):
+        return self.meta["height"]
+
+    @property
+    def fps(self):
+        return self.meta["fps"]
+
+    def times(self, clock="log"):
+        """
+        Per-frame seconds since the start of the log, either as recorded live
+        ("log") or derived from frame number / fps ("video").
+        """
+        if clock == "video":
+            return self.frame_numbers / self.fps
+        if len(self.frame_times) == 0:
+            return self.frame_times
+        return self.frame_times - self.frame_times[0]
+
+
+def crossing_times(log, line, factor, targets, clock="log"):
+    """
+    Times at which each tracked target object first crosses the virtual line.
+
+    Same rule as virtual_line.LineCounter, evaluated for the whole log at once.
+    """
+    # marker records have cls == -1, so this selects target tracks only
+    tracks = log.records[np.isin(log.records["cls"], targets)]
+    if len(tracks) < 2:
+        return np.zeros(0)
+
+    boxes = tracks["box"]
+    if line:
+        center = ((boxes[:, 1] + boxes[:, 3]) / 2).astype(np.int64)
+        position = int(log.height * factor)
+    else:
+        center = ((boxes[:, 0] + boxes[:, 2]) / 2).astype(np.int64)
+        position = int(log.width * factor)
+
+    # consecutive sightings of the same id, in frame order
+    order = np.lexsort((tracks["frame"], tracks["id"]))
+    ids = tracks["id"][order]
+    center = center[order]
+    same_id = ids[1:] == ids[:-1]
+    crossed = same_id & (center[:-1] < position) & (center[1:] >= position)
+
+    crossed_rows = order[1:][crossed]
+    # rows are sorted by id then frame, so the first hit per id is its first crossing
+    _, first = np.unique(tracks["id"][crossed_rows], return_index=True)
+    frames = tracks["frame"][crossed_rows[first]]
+
+    frame_times = log.times(clock)
+    frame_index = np.searchsorted(log.frame_numbers, frames)
+    return np.sort(frame_times[frame_index])
+
+
+def replay_statuses(log, crossings, cross_threshold, obj_per_time, time_th, bounds, clock="log"):
+    """Run ThroughputMonitor over the log clock; returns [(time, state), ...]."""
+    monitor = ThroughputMonitor(obj_per_time, time_th, bounds, cross_threshold)
+    events = []
+    i = 0
+    for now in log.times(clock):
+        while i < len(crossings) and crossings[i] <= now:
+            monitor.crossing(crossings[i])
+            i += 1
+        new_state = monitor.update(now)
+        if new_state is not None:
+            events.append((float(now), new_state))
+    return events
+
+
+def replay(log_path, line, factor, cross_threshold, targets, obj_per_time, time_th, bounds, clock="log"):
+    """Recompute the object count and status changes for one line configuration."""
+    log = log_path if isinstance(log_path, TrackLog) else TrackLog(log_path)
+    crossings = crossing_times(log, line, factor, targets, clock)
+    events = replay_statuses(log, crossings, cross_threshold, obj_per_time, time_th, bounds, clock)
+    return {
+        "count": len(crossings),
+        "crossings": crossings.tolist(),
+        "events": events,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a track log with a different line configuration")
+    parser.add_argument("log_path")
+    parser.add_argument("--horizontal", action="store_true", help="use a horizontal line (default vertical)")
+    parser.add_argument("--factor", type=float, default=0.35)
+    parser.add_argument("--cross-threshold", type=float, default=30)
+    parser.add_argument("--targets", type=int, nargs="+", default=[0, 1, 2, 3, 4, 5, 6])
+    parser.add_argument("--obj-per-time", type=float, default=3)
+    parser.add_argument("--time-th", type=float, default=30)
+    parser.add_argument("--bounds", type=float, default=1)
+    parser.add_argument("--clock", choices=["log", "video"], default="log",
+                        help="log: timestamps recorded live, video: frame number / fps")
+    args = parser.parse_args()
+
+    result = replay(args.log_path, args.horizontal, args.factor, args.cross_threshold, args.targets,
+                    args.obj_per_time, args.time_th, args.bounds, args.clock)
+
+    print(f"📦 Count: {result['count']}")
+    for timestamp, state in result["events"]:
+        print(f"🔄 {timestamp:.2f}s: {state}")
@@ -0,0 +1,178 @@
+"""
+Trackers usable by OperationStatus.
+
+"botsort" keeps using ultralytics' model.track() with botsort.yaml. "conveyor"
+runs plain detection and links boxes with ConveyorTracker, a motion-only
+tracker for rigid objects moving one way along a conveyor: no appearance
+(ReID) features, just IoU matching against boxes moved by a constant velocity
+along the conveyor axis.
+"""
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+
+class Tracker(ABC):
+    """
+    Interface: turn one frame's detections into tracked boxes.
+
+    update() returns (boxes, ids, classes, confs) as numpy arrays; ids are
+    stable across frames for the same object.
+    """
+
+    @abstractmethod
+    def update(self, boxes, classes, confs):
+        ...
+
+    @abstractmethod
+    def reset(self):
+        ...
+
+
+def iou_matrix(a, b):
+    """Pairwise IoU of (N, 4) and (M, 4) xyxy boxes."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    union = area_a[:, None] + area_b[None, :] - inter
+    return np.where(union > 0, inter / np.maximum(union, 1e-9), 0.0)
+
+
+class ConveyorTracker(Tracker):
+    def __init__(self, axis=0, iou_thresh=0.2, max_age=30, velocity_smoothing=0.5, max_distance=None, max_jump=3):
+        # axis: 0 when the conveyor moves along x (vertical line), 1 along y (horizontal line)
+        # iou_thresh: minimum IoU between a predicted track box and a detection to match them
+        # max_age: frames a track survives without a matching detection
+        # velocity_smoothing: EWMA factor for the per-track speed along the axis
+        # max_distance: centroid distance (pixels) used to match when IoU is 0; by default
+        #               the gate is max_jump box sizes along the axis (in the direction
+        #               the conveyor moves, once known) and half a box across it, so
+        #               small fast objects and dropped frames still link
+        self.axis = axis
+        self.iou_thresh = iou_thresh
+        self.max_age = max_age
+        self.velocity_smoothing = velocity_smoothing
+        self.max_distance = max_distance
+        self.max_jump = max_jump
+        self.reset()
+
+    def reset(self):
+        self.boxes = np.zeros((0, 4))
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.velocity = np.zeros(0)
+        self.age = np.zeros(0, dtype=np.int64)  # frames since last matched
+        self.next_id = 1
+
+    def _predict(self):
+        predicted = self.boxes.copy()
+        shift = self.velocity * (self.age + 1)
+        predicted[:, self.axis] += shift
+        predicted[:, self.axis + 2] += shift
+        return predicted
+
+    def _match(self, predicted, boxes):
+        """Greedy matching on IoU, with centroid distance as a fallback."""
+        if len(predicted) == 0 or len(boxes) == 0:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+        score = iou_matrix(predicted, boxes)
+        centers_t = (predicted[:, :2] + predicted[:, 2:]) / 2
+        centers_d = (boxes[:, :2] + boxes[:, 2:]) / 2
+        offset = centers_d[None, :, :] - centers_t[:, None, :]
+        if self.max_distance is None:
+            across_axis = 1 - self.axis
+            size = (predicted[:, self.axis + 2] - predicted[:, self.axis])[:, None]
+            width = (predicted[:, across_axis + 2] - predicted[:, across_axis])[:, None]
+            along = offset[..., self.axis]
+            reach = np.maximum(size * self.max_jump, 1e-9)
+            near = (np.abs(along) <= reach) & (np.abs(offset[..., across_axis]) <= width / 2)
+            moving = self.velocity[self.velocity != 0]
+            if len(moving):
+                # objects only move one way: no jumps backwards, beyond half a box of noise
+                direction = np.sign(np.median(moving))
+                near &= along * direction >= -size / 2
+            closeness = np.where(near, 1 - np.abs(along) / reach, 0)
+        else:
+            distance = np.linalg.norm(offset, axis=2)
+            closeness = np.where(distance < self.max_distance,
+                                 1 - distance / max(self.max_distance, 1e-9), 0)
+        # IoU matches always rank above distance-only matches
+        score = np.where(score >= self.iou_thresh, score + 1, 1e-3 * closeness)
+
+        track_idx, det_idx = [], []
+        flat = np.argsort(score, axis=None)[::-1]
+        used_t = np.zeros(len(predicted), dtype=bool)
+        used_d = np.zeros(len(boxes), dtype=bool)
+        for t, d in zip(*np.unravel_index(flat, score.shape)):
+            if score[t, d] <= 0:
+                break
+            if used_t[t] or used_d[d]:
+                continue
+            used_t[t] = used_d[d] = True
+            track_idx.append(t)
+            det_idx.append(d)
+        return np.array(track_idx, dtype=np.int64), np.array(det_idx, dtype=np.int64)
+
+    def update(self, boxes, classes, confs):
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        classes = np.asarray(classes).reshape(-1)
+        confs = np.asarray(confs).reshape(-1)
+
+        predicted = self._predict()
+        track_idx, det_idx = self._match(predicted, boxes)
+
+        # update matched tracks: speed along the conveyor from the center shift
+        if len(track_idx):
+            old_center = (self.boxes[track_idx, self.axis] + self.boxes[track_idx, self.axis + 2]) / 2
+            new_center = (boxes[det_idx, self.axis] + boxes[det_idx, self.axis + 2]) / 2
+            speed = (new_center - old_center) / (self.age[track_idx] + 1)
+            a = self.velocity_smoothing
+            self.velocity[track_idx] = a * speed + (1 - a) * self.velocity[track_idx]
+            self.boxes[track_idx] = boxes[det_idx]
+            self.age[track_idx] = 0
+
+        unmatched_t = np.ones(len(self.boxes), dtype=bool)
+        unmatched_t[track_idx] = False
+        self.age[unmatched_t] += 1
+
+        # new tracks start with the average speed of the line
+        unmatched_d = np.ones(len(boxes), dtype=bool)
+        unmatched_d[det_idx] = False
+        new_count = int(unmatched_d.sum())
+        new_ids = np.arange(self.next_id, self.next_id + new_count)
+        self.next_id += new_count
+        moving = self.velocity[self.age == 0]
+        start_velocity = float(np.median(moving)) if len(moving) else 0.0
+
+        out_ids = np.empty(len(boxes), dtype=np.int64)
+        out_ids[det_idx] = self.ids[track_idx]
+        out_ids[unmatched_d] = new_ids
+
+        self.boxes = np.concatenate([self.boxes, boxes[unmatched_d]])
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.velocity = np.concatenate([self.velocity, np.full(new_count, start_velocity)])
+        self.age = np.concatenate([self.age, np.zeros(new_count, dtype=np.int64)])
+
+        alive = self.age <= self.max_age
+        self.boxes, self.ids = self.boxes[alive], self.ids[alive]
+        self.velocity, self.age = self.velocity[alive], self.age[alive]
+
+        return boxes, out_ids, classes, confs
+
+
+TRACKERS = ["botsort", "conveyor"]
+
+
+def make_tracker(name, line):
+    """Tracker for OperationStatus; None means model.track() with botsort.yaml."""
+    if name == "botsort":
+        return None
+    if name == "conveyor":
+        # a vertical line counts objects moving along x, a horizontal one along y
+        return ConveyorTracker(axis=1 if line else 0)
+    raise ValueError(f"Unknown tracker: {name} (choose from {TRACKERS})")
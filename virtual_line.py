@@ -0,0 +1,224 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+from throughput import ThroughputMonitor
+
+
+class LineCounter:
+    """
+    Counts tracked objects crossing one vertical or horizontal virtual line.
+
+    An object is counted the first time its center moves from before the line
+    to on/after it between two consecutive frames in which it was tracked.
+    """
+
+    def __init__(self, line, factor, width, height, targets):
+        # line: True for a horizontal line, False for a vertical line
+        # factor: what will be multiplied with either the width or height for the line
+        # targets: a list containing the target classes
+        self.line = line
+        self.factor = factor
+        self.targets = targets
+        self.position = int(height * factor) if line else int(width * factor)
+        self.previous_positions = {}
+        self.counted = set()
+        self.count = 0
+
+    def center(self, box):
+        x1, y1, x2, y2 = box
+        return int((y1 + y2) / 2) if self.line else int((x1 + x2) / 2)
+
+    def update(self, boxes, ids, classes):
+        """
+        Feed the tracks of one frame.
+
+        Returns the ids that crossed the line in this frame (already counted
+        ids included); self.count only grows for ids crossing the first time.
+        """
+        crossed = []
+        for box, obj_id, clas in zip(boxes, ids, classes):
+            if clas not in self.targets:
+                continue
+
+            center = self.center(box)
+            prev = self.previous_positions.get(obj_id)
+            if prev is not None and prev < self.position <= center:
+                crossed.append(obj_id)
+                if obj_id not in self.counted:
+                    self.counted.add(obj_id)
+                    self.count += 1
+            self.previous_positions[obj_id] = center
+
+        return crossed
+
+    def reset_tracks(self):
+        """Forget track positions, e.g. after the tracker restarted its ids."""
+        self.previous_positions = {}
+        self.counted = set()
+
+
+@dataclass
+class LineZone:
+    """
+    A named line segment from start to end, in pixels.
+
+    Objects are counted once when their center moves from the right-hand side
+    of the start -> end direction to its left-hand side (as seen on screen)
+    through the segment itself. To count like LineCounter (objects moving down
+    or right), draw horizontal segments right to left, e.g. (640, 400) ->
+    (0, 400), and vertical segments top to bottom, e.g. (300, 0) -> (300, 480).
+    """
+    name: str
+    start: tuple
+    end: tuple
+    targets: list
+    # optional throughput expectations, same meaning as in OperationStatus;
+    # with obj_per_time set, missing values fall back to ZoneCounter's defaults
+    obj_per_time: float = None
+    time_th: float = None
+    bounds: float = None
+    cross_threshold: float = None
+
+
+@dataclass
+class PolygonZone:
+    """A named polygon (list of (x, y) pixels); each object inside it is counted once."""
+    name: str
+    points: list
+    targets: list
+    obj_per_time: float = None
+    time_th: float = None
+    bounds: float = None
+    cross_threshold: float = None
+
+
+class ZoneCounter:
+    """
+    Evaluates any number of LineZone / PolygonZone against one set of tracks per frame.
+
+    All lines are tested against all tracks with one set of array operations,
+    and each polygon with one point-in-polygon pass over all tracks, so adding
+    a zone does not need another inference pass.
+    """
+
+    def __init__(self, zones, num_classes=7, defaults=None):
+        # defaults: {"time_th": ..., "bounds": ..., "cross_threshold": ...} for
+        #           zones that set obj_per_time but leave these out, e.g. the
+        #           values of the main line in OperationStatus
+        self.zones = list(zones)
+        self.lines = [zone for zone in self.zones if isinstance(zone, LineZone)]
+        self.polygons = [zone for zone in self.zones if isinstance(zone, PolygonZone)]
+        # column order used by every per-zone array: lines first, then polygons
+        self.names = [zone.name for zone in self.lines + self.polygons]
+
+        self.starts = np.array([zone.start for zone in self.lines], dtype=np.float64).reshape(-1, 2)
+        self.directions = np.array([zone.end for zone in self.lines], dtype=np.float64).reshape(-1, 2) - self.starts
+        self.polygon_points = [np.asarray(zone.points, dtype=np.float64) for zone in self.polygons]
+
+        # targets[c, z]: zone z counts class c
+        max_class = max([num_classes - 1] + [t for zone in self.zones for t in zone.targets])
+        self.targets = np.zeros((max_class + 1, len(self.names)), dtype=bool)
+        for column, zone in enumerate(self.lines + self.polygons):
+            self.targets[list(zone.targets), column] = True
+
+        self.counts = dict.fromkeys(self.names, 0)
+        self.monitors = {}
+        defaults = defaults or {}
+        for zone in self.zones:
+            if zone.obj_per_time is None:
+                continue
+            settings = {}
+            for key in ("time_th", "bounds", "cross_threshold"):
+                value = getattr(zone, key)
+                settings[key] = defaults.get(key) if value is None else value
+                if settings[key] is None:
+                    raise ValueError(f"Zone {zone.name} sets obj_per_time but no {key}")
+            self.monitors[zone.name] = ThroughputMonitor(zone.obj_per_time, **settings)
+        self.reset_tracks()
+
+    def reset_tracks(self):
+        """Forget track positions, e.g. after the tracker restarted its ids."""
+        self.previous_centers = {}
+        self.counted = {}  # id -> bool array, one entry per zone
+
+    def _line_crossings(self, previous, centers):
+        """(tracks x lines) mask of centers moving across a segment in its direction."""
+        starts = self.starts[None, :, :]
+        directions = self.directions[None, :, :]
+        a = previous[:, None, :] - starts
+        b = centers[:, None, :] - starts
+        side_a = directions[..., 0] * a[..., 1] - directions[..., 1] * a[..., 0]
+        side_b = directions[..., 0] * b[..., 1] - directions[..., 1] * b[..., 0]
+        crossing = (side_a > 0) & (side_b <= 0)
+
+        # where the path meets the line, as a fraction along the segment
+        with np.errstate(divide="ignore", invalid="ignore"):
+            t = side_a / (side_a - side_b)
+            hit = a + t[..., None] * (b - a)
+            along = (hit * directions).sum(axis=-1) / (directions ** 2).sum(axis=-1)
+        return crossing & (along >= 0) & (along <= 1)
+
+    def _inside(self, centers):
+        """(tracks x polygons) mask of centers inside each polygon (ray casting)."""
+        inside = np.zeros((len(centers), len(self.polygons)), dtype=bool)
+        x = centers[:, 0:1]
+        y = centers[:, 1:2]
+        for column, points in enumerate(self.polygon_points):
+            x1, y1 = points[:, 0], points[:, 1]
+            x2, y2 = np.roll(x1, -1), np.roll(y1, -1)
+            spans = (y1 > y) != (y2 > y)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                x_cross = x1 + (y - y1) * (x2 - x1) / (y2 - y1)
+            inside[:, column] = (spans & (x < x_cross)).sum(axis=1) % 2 == 1
+        return inside
+
+    def update(self, boxes, ids, classes, now):
+        """
+        Feed the tracks of one frame; returns {zone name: objects counted this frame}.
+        """
+        boxes = np.asarray(boxes, dtype=np.float64).reshape(-1, 4)
+        classes = np.asarray(classes).astype(np.int64)
+        centers = np.column_stack(((boxes[:, 0] + boxes[:, 2]) / 2, (boxes[:, 1] + boxes[:, 3]) / 2))
+
+        previous = np.array([self.previous_centers.get(obj_id, (np.nan, np.nan)) for obj_id in ids],
+                            dtype=np.float64).reshape(-1, 2)
+        counted = np.array([self.counted.get(obj_id, np.zeros(len(self.names), dtype=bool)) for obj_id in ids],
+                           dtype=bool).reshape(-1, len(self.names))
+
+        hits = np.zeros((len(ids), len(self.names)), dtype=bool)
+        if self.lines:
+            # unseen ids have NaN previous centers, which never compare as crossing
+            hits[:, :len(self.lines)] = self._line_crossings(previous, centers)
+        if self.polygons:
+            hits[:, len(self.lines):] = self._inside(centers)
+
+        in_range = (classes >= 0) & (classes < len(self.targets))
+        is_target = np.zeros_like(hits)
+        is_target[in_range] = self.targets[classes[in_range]]
+        new = hits & is_target & ~counted
+
+        for obj_id, center, row_counted, row_new in zip(ids, centers, counted, new):
+            self.previous_centers[obj_id] = center
+            if row_new.any():
+                self.counted[obj_id] = row_counted | row_new
+
+        new_counts = new.sum(axis=0)
+        result = {}
+        for name, count in zip(self.names, new_counts):
+            count = int(count)
+            if count and name in self.monitors:
+                for _ in range(count):
+                    self.monitors[name].crossing(now)
+            self.counts[name] += count
+            result[name] = count
+        return result
+
+    def update_status(self, now):
+        """Returns [(zone name, new state), ...] for the zones whose status changed."""
+        changes = []
+        for name, monitor in self.monitors.items():
+            new_state = monitor.update(now)
+            if new_state is not None:
+                changes.append((name, new_state))
+        return changes